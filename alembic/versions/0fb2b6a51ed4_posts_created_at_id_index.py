@@ -0,0 +1,30 @@
+"""posts created_at id index
+
+Revision ID: 0fb2b6a51ed4
+Revises: f6cc37a5473f
+Create Date: 2026-10-18 10:52:31.418203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0fb2b6a51ed4"
+down_revision: Union[str, Sequence[str], None] = "f6cc37a5473f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_posts_created_at_id", "posts", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_posts_created_at_id", table_name="posts")
@@ -0,0 +1,84 @@
+"""post search
+
+Revision ID: 7c1e94d2ab30
+Revises: 0fb2b6a51ed4
+Create Date: 2026-10-18 11:24:09.553871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e94d2ab30"
+down_revision: Union[str, Sequence[str], None] = "0fb2b6a51ed4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # generated column: Postgres keeps it current on every INSERT/UPDATE
+        op.add_column(
+            "posts",
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(SEARCH_VECTOR, persisted=True),
+                nullable=True,
+            ),
+        )
+        op.create_index(
+            "ix_posts_search_vector",
+            "posts",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+    elif dialect == "sqlite":
+        # external-content FTS5 table, kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE posts_fts USING fts5("
+            "title, content, content='posts', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+            "INSERT INTO posts_fts(rowid, title, content) "
+            "VALUES (new.id, new.title, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_au AFTER UPDATE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); "
+            "INSERT INTO posts_fts(rowid, title, content) "
+            "VALUES (new.id, new.title, new.content); END"
+        )
+        op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_posts_search_vector", table_name="posts")
+        op.drop_column("posts", "search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("posts_fts_au", "posts_fts_ad", "posts_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
@@ -0,0 +1,71 @@
+"""follows and timelines
+
+Revision ID: a0678a4e1817
+Revises: bace4fe0d03b
+Create Date: 2026-10-18 11:57:13.609015
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a0678a4e1817"
+down_revision: Union[str, Sequence[str], None] = "bace4fe0d03b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.Integer(), nullable=False),
+        sa.Column("followee_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["followee_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["follower_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("follower_id", "followee_id"),
+    )
+    op.create_index(
+        "ix_follows_followee_id_follower_id",
+        "follows",
+        ["followee_id", "follower_id"],
+        unique=False,
+    )
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "created_at", "post_id"),
+    )
+    op.create_index(
+        "ix_timeline_entries_post_id", "timeline_entries", ["post_id"], unique=False
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "follower_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "follower_count")
+    op.drop_index("ix_timeline_entries_post_id", table_name="timeline_entries")
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_followee_id_follower_id", table_name="follows")
+    op.drop_table("follows")
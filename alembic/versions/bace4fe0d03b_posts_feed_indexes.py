@@ -0,0 +1,51 @@
+"""posts feed indexes
+
+Revision ID: bace4fe0d03b
+Revises: 7c1e94d2ab30
+Create Date: 2026-10-18 12:02:47.190312
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bace4fe0d03b"
+down_revision: Union[str, Sequence[str], None] = "7c1e94d2ab30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_posts_public_created_at_id",
+        "posts",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_public"),
+        # SQLite only matches partial indexes on the literal term queries use
+        sqlite_where=sa.text("is_public = 1"),
+    )
+    op.create_index(
+        "ix_posts_author_created_at_id",
+        "posts",
+        ["author_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    # both are prefixes of / superseded by the composite indexes above
+    op.drop_index("ix_posts_created_at_id", table_name="posts")
+    op.drop_index(op.f("ix_posts_author_id"), table_name="posts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f("ix_posts_author_id"), "posts", ["author_id"], unique=False)
+    op.create_index(
+        "ix_posts_created_at_id", "posts", ["created_at", "id"], unique=False
+    )
+    op.drop_index("ix_posts_author_created_at_id", table_name="posts")
+    op.drop_index("ix_posts_public_created_at_id", table_name="posts")
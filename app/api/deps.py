@@ -1,14 +1,22 @@
-from typing import Generator
+from functools import lru_cache
+from typing import Annotated, AsyncGenerator, Generator
 from fastapi.security import (
     HTTPAuthorizationCredentials,
     OAuth2PasswordBearer,
+    OAuth2PasswordRequestForm,
     HTTPBearer,
 )
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import app.db.session as db_session
-from app.models.user import User
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.ratelimit import RateLimited, get_rate_limiter, retry_after_header
+from app.crud import user_async
+from app.crud.post import SKIP_READ_CACHES
+from app.crud.user import UserSnapshot, get_user_snapshot
 from app.core.security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -29,10 +37,28 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if db_session.AsyncSessionLocal is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Async database is not initialized. Set DATABASE_ASYNC=true.",
+        )
+    async with db_session.AsyncSessionLocal() as db:
+        yield db
+
+
+@lru_cache()
+def get_recent_writers() -> TTLCache:
+    """User ids that wrote within ``READ_YOUR_WRITES_SECONDS`` (per process)."""
+    settings = get_settings()
+    return TTLCache(settings.USER_CACHE_SIZE, settings.READ_YOUR_WRITES_SECONDS)
+
+
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> UserSnapshot:
     user_id = decode_access_token(token)
 
     if not user_id:
@@ -44,28 +70,115 @@ def get_current_user(
     except (TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    user = db.get(User, user_id_int)
+    user = get_user_snapshot(db, user_id_int)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
         )
+    # every write goes through this dependency; keep the writer's reads on the
+    # primary until replicas have caught up
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        get_recent_writers().set(user.id, True)
     return user
 
 
-def get_current_user_optional(
-    creds: HTTPAuthorizationCredentials | None = Depends(bearer_optional),
-    db: Session = Depends(get_db),
-) -> User | None:
+def _optional_user_id(creds: HTTPAuthorizationCredentials | None) -> int | None:
     if not creds or creds.scheme.lower() != "bearer":
         return None
     user_id = decode_access_token(creds.credentials)
     if not user_id:
         return None
     try:
-        user_id_int = int(user_id)
+        return int(user_id)
     except (TypeError, ValueError):
         raise HTTPException(status_code=401, detail="Not authenticated")
-    user = db.get(User, user_id_int)
-    if not user:
+
+
+def get_current_user_optional(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_optional),
+    db: Session = Depends(get_db),
+) -> UserSnapshot | None:
+    user_id = _optional_user_id(creds)
+    if user_id is None:
         return None
-    return user
+    return get_user_snapshot(db, user_id)
+
+
+async def get_current_user_optional_async(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_optional),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot | None:
+    user_id = _optional_user_id(creds)
+    if user_id is None:
+        return None
+    return await user_async.get_user_snapshot(db, user_id)
+
+
+def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot | None = Depends(get_current_user_optional),
+) -> Generator[Session, None, None]:
+    """Session on a read replica, falling back to the primary ``get_db`` session.
+
+    Users who wrote recently read from the primary so they see their own writes,
+    and past the shared caches, which replica reads may have refilled.
+    """
+    if current_user is not None and get_recent_writers().get(current_user.id):
+        db.info[SKIP_READ_CACHES] = True
+        try:
+            yield db
+        finally:
+            db.info.pop(SKIP_READ_CACHES, None)
+        return
+    replica = db_session.ReadSessionLocal()
+    if replica is None:
+        yield db
+        return
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+
+def _client_ip(request: Request) -> str:
+    # the peer address; behind a proxy run uvicorn with --proxy-headers
+    return request.client.host if request.client else "unknown"
+
+
+def _check_limits(*checks: tuple[str, str]) -> None:
+    limiter = get_rate_limiter()
+    try:
+        limiter.check(*checks)
+    except RateLimited as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, retry later",
+            headers=retry_after_header(exc),
+        )
+
+
+# The limit dependencies are async so they run on the event loop, ahead of
+# the threadpool hop, the DB session and any bcrypt work of the route.
+
+
+async def limit_login(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+) -> None:
+    _check_limits(
+        ("login_ip", _client_ip(request)), ("login_username", form_data.username)
+    )
+
+
+async def limit_register(request: Request) -> None:
+    _check_limits(("register_ip", _client_ip(request)))
+
+
+async def limit_writes(request: Request, token: str = Depends(oauth2_scheme)) -> None:
+    checks = [("write_ip", _client_ip(request))]
+    # the token's subject, without a user lookup; invalid tokens are left to
+    # get_current_user to reject
+    user_id = decode_access_token(token)
+    if user_id:
+        checks.append(("write_user", user_id))
+    _check_limits(*checks)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.routes import posts, auth, user
+from app.api.routes import posts, auth, user, ops, feed
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
 api_router.include_router(posts.router)
 api_router.include_router(user.router)
+api_router.include_router(feed.router)
+api_router.include_router(ops.router)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_read_db
+from app.core.config import get_settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud.feed import get_feed
+from app.crud.user import UserSnapshot
+from app.schemas.post import FeedResponse
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get("", response_model=FeedResponse)
+def read_feed(
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+    limit: int = 20,
+    cursor: str | None = None,
+):
+    """Public posts of the users the caller follows, newest first."""
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
+    items = get_feed(
+        db,
+        user_id=current_user.id,
+        limit=limit,
+        cursor=after,
+        max_followers=get_settings().FEED_FANOUT_MAX_FOLLOWERS,
+    )
+    next_cursor = None
+    if items and len(items) == limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return {"items": items, "limit": limit, "next_cursor": next_cursor}
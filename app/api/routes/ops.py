@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.config import get_settings
+from app.core.security import get_token_cache
+from app.crud.post import get_count_cache, get_page_cache, get_post_cache
+from app.crud.user import get_user_cache
+from app.db import session
+
+
+def ops_enabled() -> None:
+    # pool and cache internals are for operators; off unless asked for
+    if not get_settings().OPS_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+router = APIRouter(prefix="/ops", tags=["ops"], dependencies=[Depends(ops_enabled)])
+
+
+@router.get("/caches")
+def cache_stats():
+    return {
+        "tokens": get_token_cache().stats(),
+        "users": get_user_cache().stats(),
+        "posts": get_post_cache().stats(),
+        "post_counts": get_count_cache().stats(),
+        "post_pages": get_page_cache().stats(),
+    }
+
+
+@router.get("/pool")
+def pool_stats():
+    stats = {"sync": session.InstrumentedQueuePool.stats.snapshot(session.engine.pool)}
+    if session.async_engine is not None:
+        stats["async"] = session.InstrumentedAsyncQueuePool.stats.snapshot(
+            session.async_engine.pool
+        )
+    if session.read_engines:
+        stats["read"] = [
+            read_engine.pool.stats.snapshot(read_engine.pool)
+            for read_engine in session.read_engines
+            if hasattr(read_engine.pool, "stats")
+        ]
+    return stats
@@ -1,33 +1,423 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import zlib
+from datetime import datetime
+from typing import Annotated, Iterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import StringConstraints, ValidationError
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user, get_current_user_optional
-from app.models.user import User
-from app.schemas.post import PostCreate, PostUpdate, PostRead, PostListResponse
+from app.api.deps import (
+    get_db,
+    get_read_db,
+    get_current_user,
+    get_current_user_optional,
+    limit_writes,
+)
+from app.core.compression import negotiate_encoding, weak_etag
+from app.core.config import get_settings
+from app.core.responses import FastJSONResponse
+from app.core.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.crud.user import UserSnapshot
+from app.workers.fanout import enqueue_fanout
+from app.workers.summary import enqueue_summaries
+from app.schemas.post import (
+    PostCreate,
+    PostUpdate,
+    PostRead,
+    PostReadWithAuthor,
+    AuthorRead,
+    PostListItem,
+    PostListResponse,
+    POST_EXPANSIONS,
+    POST_LIST_FIELDS,
+    PostBatchCreate,
+    PostBatchDelete,
+    PostBatchResponse,
+    PostBatchUpdate,
+    PostBatchUpdateItem,
+    PostSearchHit,
+    PostSearchResponse,
+    TotalMode,
+)
 from app.crud.post import (
+    CachedPage,
+    CachedPost,
     create_post,
+    create_posts,
+    delete_posts,
     get_post,
+    get_post_owners,
+    get_page_cached,
+    get_post_cached,
     update_post,
+    update_posts,
     delete_post,
     get_visible_posts,
+    iter_visible_posts,
+    search_posts,
 )
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+_POST_READ_FIELDS = tuple(PostRead.model_fields)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def _body_response(
+    entry: CachedPost | CachedPage,
+    headers: dict[str, str],
+    if_none_match: str | None,
+    accept_encoding: str | None,
+) -> Response:
+    """A cached JSON body with its ETag, answering conditional requests."""
+    headers["ETag"] = entry.etag
+    # served precompressed from the cache entry; the middleware passes it through
+    body = entry.body
+    settings = get_settings()
+    encoding = None
+    if settings.COMPRESSION_ENABLED and len(body) >= settings.COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(accept_encoding)
+        headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        body = entry.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = weak_etag(entry.etag)
+
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _parse_fields(fields: str) -> list[str]:
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - POST_LIST_FIELDS)
+    if not names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields",
+        )
+    return list(dict.fromkeys(["id", *names]))
+
+
+def _parse_expand(expand: str) -> set[str]:
+    names = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = sorted(names - POST_EXPANSIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expansions: {', '.join(unknown)}",
+        )
+    return names
+
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
 
 
-@router.get("", response_model=PostListResponse)
+def _decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _anonymous_page(
+    mine: bool, is_public: bool | None, skip: int, limit: int, total_mode: TotalMode
+) -> dict | None:
+    """The whole answer to a logged-out list request that needs no query."""
+    if mine:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
+        )
+    if is_public is False:
+        total = None if total_mode == "none" else 0
+        return {
+            "items": [],
+            "total": total,
+            "total_mode": total_mode,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": None,
+        }
+    return None
+
+
+def _page_cache_key(
+    current_user: UserSnapshot | None,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    total_mode: TotalMode,
+    selected: list[str] | None,
+    expand_author: bool,
+) -> tuple | None:
+    """Page cache key, or None for requests that are not served from it."""
+    # logged-out first pages are the same for everyone: serve rendered bytes
+    pages = get_settings().POST_PAGE_CACHE_PAGES
+    if current_user is not None or cursor is not None or skip >= pages * limit:
+        return None
+    # anonymous is_public=None and True both list the public posts
+    return (
+        skip,
+        limit,
+        total_mode,
+        tuple(sorted(selected)) if selected is not None else None,
+        expand_author,
+    )
+
+
+# unset item fields are left out, so a sparse page only carries what was asked for
+@router.get("", response_model=PostListResponse, response_model_exclude_unset=True)
 def read_posts(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 20,
-    current_user: User | None = Depends(get_current_user_optional),
+    current_user: UserSnapshot | None = Depends(get_current_user_optional),
+    mine: bool = False,
+    is_public: bool | None = None,
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
+    fields: str | None = None,
+    expand: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+):
+    selected = _parse_fields(fields) if fields is not None else None
+    # authors come with the page query, never one lazy load per post
+    expand_author = expand is not None and "author" in _parse_expand(expand)
+    if current_user is None:
+        empty = _anonymous_page(mine, is_public, skip, limit, total_mode)
+        if empty is not None:
+            return empty
+    # cursor takes precedence over skip: page N costs the same as page 1
+    after = _decode_cursor(cursor)
+
+    # opt-in: skip per-item model validation and encode Core rows directly
+    fast = get_settings().POST_LIST_FAST_JSON
+
+    def render():
+        fetched = _fetch_page(
+            db,
+            current_user,
+            skip=skip,
+            limit=limit,
+            mine=mine,
+            is_public=is_public,
+            cursor=after,
+            total_mode=total_mode,
+            selected=selected,
+            expand_author=expand_author,
+            fast=fast,
+        )
+        return _render_page(
+            fetched,
+            skip=skip,
+            limit=limit,
+            selected=selected,
+            expand_author=expand_author,
+            fast=fast,
+        )
+
+    key = _page_cache_key(
+        current_user, cursor, skip, limit, total_mode, selected, expand_author
+    )
+    if key is not None:
+        page = get_page_cached(key, lambda: _page_body(render()))
+        return _body_response(page, {}, if_none_match, accept_encoding)
+    return render()
+
+
+def _page_body(page: dict | Response) -> bytes:
+    if isinstance(page, Response):
+        return page.body
+    # what response_model and response_model_exclude_unset would send
+    return (
+        PostListResponse.model_validate(page).model_dump_json(exclude_unset=True)
+    ).encode()
+
+
+def _fetch_page(
+    db: Session,
+    current_user: UserSnapshot | None,
+    *,
+    skip: int,
+    limit: int,
+    mine: bool,
+    is_public: bool | None,
+    cursor: tuple[datetime, int] | None,
+    total_mode: TotalMode,
+    selected: list[str] | None,
+    expand_author: bool,
+    fast: bool,
+) -> tuple[list, int | None, TotalMode]:
+    """The database half of a list page; :func:`_render_page` is the rest."""
+    return get_visible_posts(
+        db,
+        current_user=current_user,
+        skip=skip,
+        limit=limit,
+        mine=mine,
+        is_public=is_public,
+        cursor=cursor,
+        total_mode=total_mode,
+        fields=selected,
+        rows=fast,
+        expand_author=expand_author,
+    )
+
+
+def _render_page(
+    fetched: tuple[list, int | None, TotalMode],
+    *,
+    skip: int,
+    limit: int,
+    selected: list[str] | None,
+    expand_author: bool,
+    fast: bool,
+) -> dict | Response:
+    items, total, total_mode = fetched
+    next_cursor = None
+    if items and len(items) == limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    if fast:
+        # same keys, in the same order, as the response models would emit
+        if selected is None and not expand_author:
+            names = _POST_READ_FIELDS
+        else:
+            wanted = selected if selected is not None else _POST_READ_FIELDS
+            names = [name for name in PostListItem.model_fields if name in wanted]
+        page = [{name: row._mapping[name] for name in names} for row in items]
+        if expand_author:
+            for item, row in zip(page, items):
+                item["author"] = {"id": row.author_id, "username": row.author_username}
+        return FastJSONResponse(
+            {
+                "items": page,
+                "total": total,
+                "total_mode": total_mode,
+                "skip": skip,
+                "limit": limit,
+                "next_cursor": next_cursor,
+            }
+        )
+    if selected is not None or expand_author:
+        names = selected if selected is not None else _POST_READ_FIELDS
+        items = [
+            PostListItem(
+                **{name: getattr(post, name) for name in names},
+                **(
+                    {"author": AuthorRead.model_validate(post.author)}
+                    if expand_author
+                    else {}
+                ),
+            )
+            for post in items
+        ]
+    else:
+        # validated here: the response union would also try PostListItem on the
+        # ORM objects, reading (and lazy-loading) post.author
+        items = [PostRead.model_validate(post) for post in items]
+
+    return {
+        "items": items,
+        "total": total,
+        "total_mode": total_mode,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+
+
+def _ndjson_chunks(db: Session, rows: Iterator, lines_per_chunk: int = 500):
+    try:
+        chunk = []
+        for row in rows:
+            chunk.append(PostRead.model_validate(row).model_dump_json())
+            if len(chunk) == lines_per_chunk:
+                yield ("\n".join(chunk) + "\n").encode()
+                chunk.clear()
+        if chunk:
+            yield ("\n".join(chunk) + "\n").encode()
+    finally:
+        # dependency teardown has already run; release the streaming connection
+        db.close()
+
+
+def _gzip_chunks(chunks: Iterator[bytes]):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip framing
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_posts(
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot | None = Depends(get_current_user_optional),
+    mine: bool = False,
+    is_public: bool | None = None,
+    gzip: bool = False,
+):
+    if current_user is None and mine:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
+        )
+
+    rows = iter([])
+    if current_user is not None or is_public is not False:
+        rows = iter_visible_posts(
+            db, current_user=current_user, mine=mine, is_public=is_public
+        )
+    body = _ndjson_chunks(db, rows)
+    headers = {"Content-Disposition": 'attachment; filename="posts.ndjson"'}
+    if gzip:
+        body = _gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/search", response_model=PostSearchResponse)
+def search(
+    # stripped first, so a blank q is rejected like an empty one
+    q: Annotated[
+        str,
+        StringConstraints(strip_whitespace=True, min_length=1, max_length=200),
+        Query(),
+    ],
+    db: Session = Depends(get_read_db),
+    limit: int = 20,
+    current_user: UserSnapshot | None = Depends(get_current_user_optional),
     mine: bool = False,
     is_public: bool | None = None,
+    cursor: str | None = None,
 ):
     if current_user is None:
         if mine:
@@ -35,32 +425,69 @@ def read_posts(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
             )
         if is_public is False:
-            return {"items": [], "total": 0, "skip": skip, "limit": limit}
+            return {"items": [], "limit": limit}
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_rank_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
 
-    items, total = get_visible_posts(
+    rows = search_posts(
         db,
+        q=q,
         current_user=current_user,
-        skip=skip,
         limit=limit,
         mine=mine,
         is_public=is_public,
+        cursor=after,
     )
 
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    items = [
+        PostSearchHit(**PostRead.model_validate(post).model_dump(), rank=rank)
+        for post, rank in rows
+    ]
+    next_cursor = None
+    if rows and len(rows) == limit:
+        post, rank = rows[-1]
+        next_cursor = encode_rank_cursor(rank, post.id)
 
+    return {"items": items, "limit": limit, "next_cursor": next_cursor}
 
-@router.get("/{post_id}", response_model=PostRead)
+
+@router.get(
+    "/{post_id}",
+    response_model=PostRead | PostReadWithAuthor,
+    responses={304: {"description": "Not modified"}},
+)
 def read_post(
     post_id: int,
-    db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_current_user_optional),
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot | None = Depends(get_current_user_optional),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+    expand: str | None = None,
 ):
-    post = get_post(db, post_id)
+    expand_author = expand is not None and "author" in _parse_expand(expand)
+    post = get_post_cached(db, post_id, expand_author=expand_author)
+    return _post_response(post, current_user, if_none_match, accept_encoding)
+
+
+def _post_response(
+    post: CachedPost | None,
+    current_user: UserSnapshot | None,
+    if_none_match: str | None,
+    accept_encoding: str | None,
+) -> Response:
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
         )
 
+    headers = {}
     if not post.is_public:
         if current_user is None:
             raise HTTPException(
@@ -70,25 +497,39 @@ def read_post(
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
             )
-    return post
+        headers["Cache-Control"] = "private"
+    return _body_response(post, headers, if_none_match, accept_encoding)
 
 
-@router.post("", response_model=PostRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=PostRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)],
+)
 def create_new_post(
     post_in: PostCreate,
     db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    author_id = current_user.id
-    return create_post(db, post_in=post_in, author_id=author_id)
+    post = create_post(db, post_in=post_in, author_id=current_user.id)
+    enqueue_summaries([post.id])
+    if post.is_public:
+        enqueue_fanout([post.id])
+    return post
 
 
-@router.patch("/{post_id}", response_model=PostRead, status_code=status.HTTP_200_OK)
+@router.patch(
+    "/{post_id}",
+    response_model=PostRead,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
+)
 def update_existing_post(
     post_id: int,
     post_in: PostUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     post = get_post(db, post_id)
 
@@ -102,14 +543,24 @@ def update_existing_post(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
 
-    return update_post(db, post=post, post_in=post_in)
+    post = update_post(db, post=post, post_in=post_in)
+    if post_in.content is not None:
+        enqueue_summaries([post.id])
+    # delivery skips posts already in timelines, so no need to check what it was
+    if post_in.is_public:
+        enqueue_fanout([post.id])
+    return post
 
 
-@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{post_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)],
+)
 def delete_existing_post(
     post_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     post = get_post(db, post_id)
 
@@ -125,3 +576,166 @@ def delete_existing_post(
 
     delete_post(db, post=post)
     return None
+
+
+def _invalid_item(index: int, exc: ValidationError) -> dict:
+    return {
+        "index": index,
+        "status": status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "error": exc.errors(include_url=False, include_context=False),
+    }
+
+
+def _batch_response(results: list[dict]) -> dict:
+    results.sort(key=lambda result: result["index"])
+    failed = sum(1 for result in results if result["status"] >= 400)
+    return {"items": results, "succeeded": len(results) - failed, "failed": failed}
+
+
+def _check_batch_ownership(
+    db: Session, targets: dict[int, int], author_id: int, results: list[dict]
+) -> tuple[list[int], bool]:
+    """One query for all ``post_id -> index`` targets; failures go to ``results``.
+
+    Returns the ids the author may change and whether any of them is public.
+    """
+    owners = get_post_owners(db, list(targets))
+    allowed, was_public = [], False
+    for post_id, index in targets.items():
+        owner = owners.get(post_id)
+        if owner is None:
+            results.append(
+                {
+                    "index": index,
+                    "status": 404,
+                    "id": post_id,
+                    "error": "Post not found",
+                }
+            )
+        elif owner[0] != author_id:
+            results.append(
+                {
+                    "index": index,
+                    "status": 403,
+                    "id": post_id,
+                    "error": "Not enough permissions",
+                }
+            )
+        else:
+            allowed.append(post_id)
+            was_public = was_public or owner[1]
+    return allowed, was_public
+
+
+@router.post(
+    ":batch", response_model=PostBatchResponse, dependencies=[Depends(limit_writes)]
+)
+def create_posts_batch(
+    batch: PostBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    results, valid = [], []
+    for index, raw in enumerate(batch.items):
+        try:
+            valid.append((index, PostCreate.model_validate(raw)))
+        except ValidationError as exc:
+            results.append(_invalid_item(index, exc))
+
+    if valid:
+        posts = create_posts(
+            db, posts_in=[post_in for _, post_in in valid], author_id=current_user.id
+        )
+        enqueue_summaries(post.id for post in posts)
+        enqueue_fanout(post.id for post in posts if post.is_public)
+        results.extend(
+            {"index": index, "status": 201, "id": post.id, "item": post}
+            for (index, _), post in zip(valid, posts)
+        )
+    return _batch_response(results)
+
+
+@router.patch(
+    ":batch", response_model=PostBatchResponse, dependencies=[Depends(limit_writes)]
+)
+def update_posts_batch(
+    batch: PostBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    results, valid = [], {}
+    for index, raw in enumerate(batch.items):
+        try:
+            item = PostBatchUpdateItem.model_validate(raw)
+        except ValidationError as exc:
+            results.append(_invalid_item(index, exc))
+            continue
+        if item.id in valid:
+            results.append(
+                {
+                    "index": index,
+                    "status": 409,
+                    "id": item.id,
+                    "error": "Post appears more than once in the batch",
+                }
+            )
+            continue
+        valid[item.id] = (index, item)
+
+    if valid:
+        targets = {post_id: index for post_id, (index, _) in valid.items()}
+        allowed, was_public = _check_batch_ownership(
+            db, targets, current_user.id, results
+        )
+        if allowed:
+            posts = update_posts(
+                db,
+                updates={post_id: valid[post_id][1] for post_id in allowed},
+                author_id=current_user.id,
+                was_public=was_public,
+            )
+            enqueue_summaries(
+                post_id for post_id in allowed if valid[post_id][1].content is not None
+            )
+            enqueue_fanout(
+                post_id for post_id in allowed if valid[post_id][1].is_public
+            )
+            results.extend(
+                {"index": targets[post.id], "status": 200, "id": post.id, "item": post}
+                for post in posts
+            )
+    return _batch_response(results)
+
+
+@router.delete(
+    ":batch", response_model=PostBatchResponse, dependencies=[Depends(limit_writes)]
+)
+def delete_posts_batch(
+    batch: PostBatchDelete,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    results, targets = [], {}
+    for index, post_id in enumerate(batch.ids):
+        if post_id in targets:
+            results.append(
+                {
+                    "index": index,
+                    "status": 409,
+                    "id": post_id,
+                    "error": "Post appears more than once in the batch",
+                }
+            )
+        else:
+            targets[post_id] = index
+
+    allowed, was_public = _check_batch_ownership(db, targets, current_user.id, results)
+    if allowed:
+        delete_posts(
+            db, post_ids=allowed, author_id=current_user.id, was_public=was_public
+        )
+        results.extend(
+            {"index": targets[post_id], "status": 204, "id": post_id}
+            for post_id in allowed
+        )
+    return _batch_response(results)
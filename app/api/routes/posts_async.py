@@ -0,0 +1,133 @@
+"""``async def`` versions of the post read endpoints, for DATABASE_ASYNC=true.
+
+Registered ahead of :mod:`app.api.routes.posts`, so they answer ``GET
+/api/posts`` and ``GET /api/posts/{post_id}`` on the asyncio engine and a
+request waiting on the database holds no threadpool thread. Only the queries
+run in ``AsyncSession.run_sync``; rendering, shared with the sync handlers, goes
+to the threadpool so it does not hold up the event loop.
+"""
+
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_user_optional_async
+from app.api.routes.posts import (
+    _anonymous_page,
+    _body_response,
+    _decode_cursor,
+    _fetch_page,
+    _page_body,
+    _page_cache_key,
+    _parse_expand,
+    _parse_fields,
+    _post_response,
+    _render_page,
+)
+from app.core.config import get_settings
+from app.crud import post_async
+from app.crud.post import cache_post, lookup_post
+from app.crud.user import UserSnapshot
+from app.schemas.post import (
+    PostListResponse,
+    PostRead,
+    PostReadWithAuthor,
+    TotalMode,
+)
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+
+
+# the sync routes document the same parameters and responses
+@router.get(
+    "",
+    response_model=PostListResponse,
+    response_model_exclude_unset=True,
+    include_in_schema=False,
+)
+async def read_posts(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 20,
+    current_user: UserSnapshot | None = Depends(get_current_user_optional_async),
+    mine: bool = False,
+    is_public: bool | None = None,
+    cursor: str | None = None,
+    total_mode: TotalMode = "exact",
+    fields: str | None = None,
+    expand: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+):
+    selected = _parse_fields(fields) if fields is not None else None
+    expand_author = expand is not None and "author" in _parse_expand(expand)
+    if current_user is None:
+        empty = _anonymous_page(mine, is_public, skip, limit, total_mode)
+        if empty is not None:
+            return empty
+    after = _decode_cursor(cursor)
+    fast = get_settings().POST_LIST_FAST_JSON
+
+    async def render() -> bytes:
+        fetched = await db.run_sync(
+            lambda session: _fetch_page(
+                session,
+                current_user,
+                skip=skip,
+                limit=limit,
+                mine=mine,
+                is_public=is_public,
+                cursor=after,
+                total_mode=total_mode,
+                selected=selected,
+                expand_author=expand_author,
+                fast=fast,
+            )
+        )
+        # serialization is CPU work: off the event loop, as for the sync routes
+        return await run_in_threadpool(
+            lambda: _page_body(
+                _render_page(
+                    fetched,
+                    skip=skip,
+                    limit=limit,
+                    selected=selected,
+                    expand_author=expand_author,
+                    fast=fast,
+                )
+            )
+        )
+
+    key = _page_cache_key(
+        current_user, cursor, skip, limit, total_mode, selected, expand_author
+    )
+    if key is not None:
+        page = await post_async.get_page_cached(key, render)
+        return _body_response(page, {}, if_none_match, accept_encoding)
+    # already what response_model would send, so it is not validated again
+    return Response(content=await render(), media_type="application/json")
+
+
+# :int keeps /posts/search, /posts/export and /posts/health on the sync router
+@router.get(
+    "/{post_id:int}",
+    response_model=PostRead | PostReadWithAuthor,
+    include_in_schema=False,
+)
+async def read_post(
+    post_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot | None = Depends(get_current_user_optional_async),
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+    expand: str | None = None,
+):
+    expand_author = expand is not None and "author" in _parse_expand(expand)
+    post = lookup_post(post_id, expand_author=expand_author)
+    if post is None:
+        loaded = await post_async.get_post(db, post_id, expand_author=expand_author)
+        if loaded is not None:
+            post = await run_in_threadpool(
+                cache_post, loaded, expand_author=expand_author
+            )
+    return _post_response(post, current_user, if_none_match, accept_encoding)
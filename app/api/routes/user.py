@@ -4,22 +4,34 @@ from fastapi import Depends, APIRouter, HTTPException
 from sqlalchemy.orm import Session
 from starlette import status
 
-from app.api.deps import get_current_user, get_db
-from app.models.user import User
+from app.api.deps import get_current_user, get_db, limit_register, limit_writes
+from app.core.config import get_settings
+from app.core.security import PasswordHashingBusy
 from app.schemas.user import UserRead, UserCreate
-from app.crud.user import get_by_username, create_user
+from app.crud.feed import follow, unfollow
+from app.crud.user import (
+    UserSnapshot,
+    get_by_username,
+    get_user_snapshot,
+    create_user,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserRead)
 def read_current_user(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     return current_user
 
 
-@router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=UserRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_register)],
+)
 def register_user(
     user_in: UserCreate,
     db: Session = Depends(get_db),
@@ -36,5 +48,61 @@ def register_user(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Username already exists"
         )
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent registrations, retry shortly",
+            headers={"Retry-After": "1"},
+        )
 
     return user
+
+
+@router.put(
+    "/{user_id}/follow",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)],
+)
+def follow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    if user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot follow yourself"
+        )
+    if get_user_snapshot(db, user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    settings = get_settings()
+    follow(
+        db,
+        follower_id=current_user.id,
+        followee_id=user_id,
+        backfill=settings.FEED_FOLLOW_BACKFILL,
+        max_followers=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    )
+    return None
+
+
+@router.delete(
+    "/{user_id}/follow",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)],
+)
+def unfollow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    settings = get_settings()
+    unfollow(
+        db,
+        follower_id=current_user.id,
+        followee_id=user_id,
+        backfill=settings.FEED_FOLLOW_BACKFILL,
+        max_followers=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    )
+    return None
@@ -0,0 +1,126 @@
+"""Operational commands: ``python -m app.cli <command> --help``."""
+
+import argparse
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.crud.post import summary_backfill_ids
+from app.db import session as db_session
+from app.ingest import FORMATS, KINDS, IngestError, detect_format, ingest
+from app.workers.summary import summarize_posts
+
+
+def backfill_summaries(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    db_session.init_engine(settings.DATABASE_URL)
+    length = args.length or settings.SUMMARY_LENGTH
+    done = 0
+    last_id = 0
+    with db_session.SessionLocal() as db:
+        while True:
+            post_ids = summary_backfill_ids(
+                db, after_id=last_id, limit=args.batch_size, missing_only=not args.all
+            )
+            if not post_ids:
+                break
+            done += summarize_posts(db, post_ids, length)
+            last_id = post_ids[-1]
+            print(f"summarized {done} posts (up to id {last_id})")
+    print(f"done: {done} posts")
+
+
+def ingest_file(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    db_session.init_engine(settings.DATABASE_URL)
+    engine = db_session.engine
+    path: Path = args.path
+    checkpoint_path = args.checkpoint or path.with_name(path.name + ".checkpoint")
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    try:
+        checkpoint = ingest(
+            engine.begin,
+            path,
+            kind=args.kind,
+            fmt=args.format or detect_format(path),
+            chunk_size=args.chunk_size,
+            checkpoint_path=checkpoint_path,
+            rejects_path=args.rejects or path.with_name(path.name + ".rejects.jsonl"),
+            max_errors=args.max_errors,
+            default_author=args.author,
+            summary_length=None if args.no_summaries else settings.SUMMARY_LENGTH,
+        )
+    except IngestError as exc:
+        raise SystemExit(f"error: {exc}") from None
+    if engine.dialect.name == "postgresql":
+        # fresh planner statistics after a large load (also total_mode=estimated)
+        with engine.connect() as conn:
+            conn.execute(text(f"ANALYZE {args.kind}"))
+            conn.commit()
+    print(
+        f"done: {checkpoint.rows} rows, {checkpoint.rejected} rejected "
+        f"(checkpoint {checkpoint_path})"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-summaries", help="fill Post.summary for existing posts"
+    )
+    backfill.add_argument("--batch-size", type=int, default=500)
+    backfill.add_argument(
+        "--length", type=int, default=None, help="defaults to SUMMARY_LENGTH"
+    )
+    backfill.add_argument(
+        "--all", action="store_true", help="recompute posts that already have one"
+    )
+    backfill.set_defaults(handler=backfill_summaries)
+
+    load = commands.add_parser(
+        "ingest", help="bulk-load posts or users from a JSONL or CSV file"
+    )
+    load.add_argument("path", type=Path)
+    load.add_argument("--kind", choices=KINDS, default="posts")
+    load.add_argument(
+        "--format", choices=FORMATS, default=None, help="defaults to the file suffix"
+    )
+    load.add_argument("--chunk-size", type=int, default=5000)
+    load.add_argument(
+        "--author", default=None, help="username for posts that don't name one"
+    )
+    load.add_argument(
+        "--no-summaries",
+        action="store_true",
+        help="leave Post.summary empty for backfill-summaries (faster)",
+    )
+    load.add_argument(
+        "--checkpoint", type=Path, default=None, help="defaults to PATH.checkpoint"
+    )
+    load.add_argument(
+        "--restart", action="store_true", help="ignore an existing checkpoint"
+    )
+    load.add_argument(
+        "--rejects",
+        type=Path,
+        default=None,
+        help="invalid records are appended here; defaults to PATH.rejects.jsonl",
+    )
+    load.add_argument(
+        "--max-errors",
+        type=int,
+        default=1000,
+        help="stop when more records than this are rejected",
+    )
+    load.set_defaults(handler=ingest_file)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
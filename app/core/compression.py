@@ -0,0 +1,150 @@
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson")
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content-codings we can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Best supported content-coding allowed by an ``Accept-Encoding`` header."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    settings = get_settings()
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_LEVEL)
+    # mtime=0 keeps the output stable for identical bodies
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        settings = get_settings()
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_LEVEL)
+        else:
+            self._brotli = None
+            # wbits 16 + MAX_WBITS writes a gzip header and trailer
+            self._zlib = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    def process(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + self._brotli.finish() if final else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush() if final else out
+
+
+def weak_etag(etag: str) -> str:
+    # a compressed body is a different byte sequence, so a strong validator
+    # can't be shared with the identity form
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression of response bodies.
+
+    Bodies smaller than ``minimum_size`` go out as is; streaming responses are
+    compressed chunk by chunk. Responses that already carry a
+    ``Content-Encoding`` (such as precompressed cache entries) are passed
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _StreamCompressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not content_type.startswith(_COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:  # headers depend on the first body chunk
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = weak_etag(headers["etag"])
+                if more_body:
+                    del headers["Content-Length"]
+                    compressor = _StreamCompressor(encoding)
+                    body = compressor.process(body, final=False)
+                else:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            else:
+                body = compressor.process(body, final=not more_body)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -9,17 +9,118 @@ def _load_env_once() -> None:
     load_dotenv(env_file, override=False)
 
 
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
 class Settings:
     def __init__(self):
         _load_env_once()
 
         self.ENV = os.getenv("ENV", "dev")
         self.DATABASE_URL = os.getenv("DATABASE_URL")
+        # async engine (asyncpg / aiosqlite); URL defaults to DATABASE_URL's
+        self.DATABASE_ASYNC = _env_bool("DATABASE_ASYNC", "false")
+        self.ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+        # comma-separated read replicas for GET endpoints; a user's reads stay on
+        # the primary for READ_YOUR_WRITES_SECONDS after they write
+        self.DATABASE_READ_URLS = [
+            url.strip()
+            for url in os.getenv("DATABASE_READ_URLS", "").split(",")
+            if url.strip()
+        ]
+        self.READ_YOUR_WRITES_SECONDS = float(
+            os.getenv("READ_YOUR_WRITES_SECONDS", "5")
+        )
+        # connection pool; DB_POOL_PRE_PING=false with DB_POOL_RECYCLE > 0 trades
+        # the per-checkout liveness round trip for periodic reconnects
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+        self.DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
         self.JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
         self.JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
         self.ACCESS_TOKEN_EXPIRE_MINUTES = int(
             os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "20")
         )
+        # verified bearer tokens, cached until their own exp
+        self.JWT_CACHE_ENABLED = _env_bool("JWT_CACHE_ENABLED", "true")
+        self.JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+        # bcrypt runs on a bounded pool; callers beyond workers + queue get a 503
+        self.PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        self.PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+        # token buckets, "<count>/<second|minute|hour|day>" per key, checked
+        # before any hashing or DB work; an empty value turns that limit off
+        self.RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED", "true")
+        # "memory" (per process) or "package.module:factory" called with settings
+        self.RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+        self.RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "30/minute")
+        self.RATE_LIMIT_LOGIN_USERNAME = os.getenv(
+            "RATE_LIMIT_LOGIN_USERNAME", "10/minute"
+        )
+        self.RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "10/minute")
+        self.RATE_LIMIT_WRITE_IP = os.getenv("RATE_LIMIT_WRITE_IP", "600/minute")
+        self.RATE_LIMIT_WRITE_USER = os.getenv("RATE_LIMIT_WRITE_USER", "120/minute")
+        # authenticated-user snapshots used by the auth dependencies
+        self.USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+        self.USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+        # serialized single posts behind GET /api/posts/{post_id}
+        self.POST_CACHE_SIZE = int(os.getenv("POST_CACHE_SIZE", "10000"))
+        self.POST_CACHE_TTL_SECONDS = float(os.getenv("POST_CACHE_TTL_SECONDS", "60"))
+        # rendered anonymous GET /api/posts responses for the first
+        # POST_PAGE_CACHE_PAGES offset pages (0 turns it off); public-post
+        # writes in this process drop them at once, the TTL bounds how long other
+        # processes and lagging replicas can serve an older page
+        self.POST_PAGE_CACHE_PAGES = int(os.getenv("POST_PAGE_CACHE_PAGES", "3"))
+        self.POST_PAGE_CACHE_SIZE = int(os.getenv("POST_PAGE_CACHE_SIZE", "1000"))
+        self.POST_PAGE_CACHE_TTL_SECONDS = float(
+            os.getenv("POST_PAGE_CACHE_TTL_SECONDS", "5")
+        )
+        # total_mode=cached on GET /api/posts
+        self.POST_COUNT_CACHE_SIZE = int(os.getenv("POST_COUNT_CACHE_SIZE", "10000"))
+        self.POST_COUNT_CACHE_TTL_SECONDS = float(
+            os.getenv("POST_COUNT_CACHE_TTL_SECONDS", "30")
+        )
+        # Prometheus text metrics at GET /metrics
+        self.METRICS_ENABLED = _env_bool("METRICS_ENABLED", "true")
+        # pool and cache statistics under /api/ops (no auth; keep them internal)
+        self.OPS_ENDPOINTS_ENABLED = _env_bool("OPS_ENDPOINTS_ENABLED", "false")
+        # per-request SQL diagnostics: statement budgets per route ("GET
+        # /api/posts=3,..." over QUERY_BUDGET_DEFAULT, 0 for none) and lazy
+        # relationship loads are logged, or raise with QUERY_BUDGET_MODE=raise /
+        # QUERY_DEBUG_RAISELOAD; SLOW_QUERY_MS > 0 logs slower statements
+        self.QUERY_DEBUG = _env_bool("QUERY_DEBUG", "false")
+        self.QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+        self.QUERY_BUDGETS = os.getenv("QUERY_BUDGETS", "")
+        self.QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn")
+        self.QUERY_DEBUG_RAISELOAD = _env_bool("QUERY_DEBUG_RAISELOAD", "false")
+        self.SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+        # negotiated gzip / brotli (when installed) for responses of at least
+        # COMPRESSION_MIN_SIZE bytes
+        self.COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", "true")
+        self.COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.COMPRESSION_BROTLI_LEVEL = int(os.getenv("COMPRESSION_BROTLI_LEVEL", "4"))
+        # GET /api/posts encodes Core rows with orjson instead of PostRead models
+        self.POST_LIST_FAST_JSON = _env_bool("POST_LIST_FAST_JSON", "false")
+        # background excerpts written to Post.summary after creates and edits
+        self.SUMMARY_WORKER_ENABLED = _env_bool("SUMMARY_WORKER_ENABLED", "true")
+        self.SUMMARY_LENGTH = int(os.getenv("SUMMARY_LENGTH", "200"))
+        self.SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "100"))
+        self.SUMMARY_QUEUE_SIZE = int(os.getenv("SUMMARY_QUEUE_SIZE", "10000"))
+        # home timelines behind GET /api/feed: new public posts are copied to
+        # followers' timelines in the background, except for authors with more
+        # than FEED_FANOUT_MAX_FOLLOWERS followers, merged in at read time
+        self.FEED_FANOUT_ENABLED = _env_bool("FEED_FANOUT_ENABLED", "true")
+        self.FEED_FANOUT_MAX_FOLLOWERS = int(
+            os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "10000")
+        )
+        self.FEED_FANOUT_BATCH_SIZE = int(os.getenv("FEED_FANOUT_BATCH_SIZE", "100"))
+        self.FEED_FANOUT_QUEUE_SIZE = int(os.getenv("FEED_FANOUT_QUEUE_SIZE", "10000"))
+        # a new follow copies the followee's latest posts into the timeline
+        self.FEED_FOLLOW_BACKFILL = int(os.getenv("FEED_FOLLOW_BACKFILL", "20"))
         if not self.DATABASE_URL:
             raise RuntimeError(
                 f"DATABASE_URL is not set (ENV_FILE={os.getenv('ENV_FILE', '.env')})"
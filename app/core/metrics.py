@@ -0,0 +1,227 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Values are per process, like the caches: with several workers each one serves
+its own ``/metrics``, and Prometheus sums them across scrape targets.
+"""
+
+import bisect
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+        REGISTRY.append(self)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.extend(self._samples(labels, value))
+        return lines
+
+    def _samples(self, labels: tuple, value) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, amount: float, labels: tuple = ()) -> None:
+        # one flat list per series: a count per bucket (the last one is +Inf,
+        # not cumulative), then the sum and the total count
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += amount
+            state[-1] += 1
+
+    def count(self, labels: tuple = ()) -> int:
+        state = self._values.get(labels)
+        return state[-1] if state else 0
+
+    def _samples(self, labels: tuple, state) -> list[str]:
+        names = (*self.labelnames, "le")
+        lines = []
+        cumulative = 0
+        for bound, n in zip((*self.buckets, "+Inf"), state):
+            cumulative += n
+            lines.append(
+                f"{self.name}_bucket{_labels(names, (*labels, bound))} {cumulative}"
+            )
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {state[-2]}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+# the _count series doubles as the request counter
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response byte.",
+    ("method", "route", "status"),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled.")
+REQUEST_QUERIES = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL while handling one request.",
+    ("method", "route"),
+)
+PASSWORD_HASHING = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt time per hash or verify call.",
+    ("operation",),
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2),
+)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "scope", "lazy_loads")
+
+    def __init__(self, scope: Scope | None = None):
+        self.count = 0
+        self.seconds = 0.0
+        # the request's ASGI scope; its "route" is set once routing has matched
+        self.scope = scope
+        # relationship -> lazy loads, when app.core.querydebug is watching
+        self.lazy_loads: Counter | None = None
+
+
+# set per request; sync handlers run in a copy of the context, and share the
+# same QueryStats object with the middleware
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute the engine's statements to the request that runs them."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Records per-route request count, latency and SQL use.
+
+    The route label is the matched path template (``/api/posts/{post_id}``), so
+    label cardinality is bounded by the routes, not by the URLs requested.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = QueryStats(scope)
+        token = current_query_stats.set(queries)
+        started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            current_query_stats.reset(token)
+            path = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.observe(elapsed, (scope["method"], path, status))
+            labels = (scope["method"], path)
+            REQUEST_QUERIES.observe(queries.count, labels)
+            REQUEST_DB_TIME.observe(queries.seconds, labels)
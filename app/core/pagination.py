@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """Opaque keyset cursor pointing just past the given ``(created_at, id)``."""
+    return _encode([created_at.isoformat(), post_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, post_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_rank_cursor(rank: float, post_id: int) -> str:
+    """Keyset cursor for relevance-ordered results, keyed on ``(rank, id)``."""
+    return _encode([rank, post_id])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, post_id = _decode(cursor)
+        return float(rank), int(post_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
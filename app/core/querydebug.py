@@ -0,0 +1,172 @@
+"""Per-request SQL diagnostics: statement budgets, lazy loads and slow statements.
+
+Builds on the per-request ``QueryStats`` of app.core.metrics. With
+``QUERY_DEBUG`` on, a request that runs more statements than its route's
+budget is logged (``QUERY_BUDGET_MODE=warn``) or fails at the first statement
+over it (``raise``), and every lazy relationship load is reported with the
+relationship and route, since one per row is the N+1 pattern.
+``QUERY_DEBUG_RAISELOAD`` turns such loads into errors instead, which is
+meant for tests. ``SLOW_QUERY_MS`` logs slow statements independently.
+"""
+
+import logging
+import time
+from collections import Counter
+from functools import lru_cache
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request tried to run more statements than its route's budget."""
+
+
+@lru_cache()
+def parse_budgets(value: str) -> dict[tuple[str, str], int]:
+    """``"GET /api/posts=3, POST /api/posts:batch=4"`` -> {(method, path): 3, ...}."""
+    budgets = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        route, _, count = entry.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        budgets[(method.upper(), path.strip())] = int(count)
+    return budgets
+
+
+def _route(stats: QueryStats) -> tuple[str, str]:
+    scope = stats.scope or {}
+    return scope.get("method", "?"), getattr(scope.get("route"), "path", "unmatched")
+
+
+def route_budget(method: str, path: str) -> int | None:
+    settings = get_settings()
+    budget = parse_budgets(settings.QUERY_BUDGETS).get(
+        (method, path), settings.QUERY_BUDGET_DEFAULT
+    )
+    return budget or None
+
+
+def _check_budget(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None or stats.scope is None:
+        return
+    settings = get_settings()
+    if not settings.QUERY_DEBUG or settings.QUERY_BUDGET_MODE != "raise":
+        return
+    method, path = _route(stats)
+    budget = route_budget(method, path)
+    if budget is not None and stats.count >= budget:
+        raise QueryBudgetExceeded(
+            f"{method} {path} exceeded its budget of {budget} statements: {statement}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+    threshold = get_settings().SLOW_QUERY_MS
+    if not threshold or elapsed * 1000 < threshold:
+        return
+    stats = current_query_stats.get()
+    method, path = _route(stats) if stats is not None else ("-", "outside a request")
+    logger.warning(
+        "slow statement (%.1f ms) in %s %s: %s",
+        elapsed * 1000,
+        method,
+        path,
+        " ".join(statement.split())[:500],
+    )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("slow_query_started"):
+        conn.info["slow_query_started"].pop()
+
+
+def _on_orm_execute(state: ORMExecuteState) -> None:
+    if not state.is_select:
+        return
+    if state.lazy_loaded_from is not None:
+        stats = current_query_stats.get()
+        if stats is not None and stats.lazy_loads is not None:
+            stats.lazy_loads[str(state.loader_strategy_path.path[-1])] += 1
+    elif (
+        not state.is_column_load
+        and not state.is_relationship_load
+        and get_settings().QUERY_DEBUG_RAISELOAD
+    ):
+        # only where SQL would be emitted: identity-map hits are still fine
+        state.statement = state.statement.options(raiseload("*", sql_only=True))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Budget checks and the slow-statement log for ``engine``'s statements."""
+    if event.contains(engine, "before_cursor_execute", _check_budget):
+        return
+    # ahead of the metrics listeners, whose bookkeeping a raise here would skip
+    event.listen(engine, "before_cursor_execute", _check_budget, insert=True)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def instrument_sessions() -> None:
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+class QueryDebugMiddleware:
+    """Reports, once per request, budget overruns and lazy relationship loads."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # shared with MetricsMiddleware when that runs too
+        stats = current_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats(scope)
+            token = current_query_stats.set(stats)
+        stats.lazy_loads = Counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if token is not None:
+                current_query_stats.reset(token)
+            self.report(stats)
+
+    @staticmethod
+    def report(stats: QueryStats) -> None:
+        method, path = _route(stats)
+        budget = route_budget(method, path)
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                "%s %s ran %d statements, over its budget of %d",
+                method,
+                path,
+                stats.count,
+                budget,
+            )
+        if stats.lazy_loads:
+            logger.warning(
+                "%s %s lazy-loaded %s; load them with the query instead",
+                method,
+                path,
+                ", ".join(f"{name} x{n}" for name, n in stats.lazy_loads.items()),
+            )
@@ -0,0 +1,162 @@
+import importlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Hashable, Protocol
+
+from app.core.config import Settings, get_settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# limit name -> Settings attribute holding its "<count>/<period>" string
+LIMITS = {
+    "login_ip": "RATE_LIMIT_LOGIN_IP",
+    "login_username": "RATE_LIMIT_LOGIN_USERNAME",
+    "register_ip": "RATE_LIMIT_REGISTER_IP",
+    "write_ip": "RATE_LIMIT_WRITE_IP",
+    "write_user": "RATE_LIMIT_WRITE_USER",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """Token bucket: refills at ``rate`` tokens per second up to ``burst``."""
+
+    rate: float
+    burst: float
+
+
+def parse_limit(value: str) -> RateLimit | None:
+    """``"10/minute"`` -> 10 requests per minute, in bursts of up to 10; ``""`` -> off."""
+    value = value.strip()
+    if not value:
+        return None
+    count, _, period = value.partition("/")
+    seconds = _PERIODS.get(period.strip().lower().rstrip("s"))
+    if seconds is None or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"invalid rate limit {value!r}, expected e.g. '10/minute'")
+    return RateLimit(rate=int(count) / seconds, burst=int(count))
+
+
+class RateLimited(RuntimeError):
+    """The request is over its limit; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class RateLimitBackend(Protocol):
+    """Where buckets live. Called on the event loop, so ``hit`` must be quick."""
+
+    def hit(self, key: Hashable, limit: RateLimit) -> float:
+        """Take a token from ``key``'s bucket: 0 if there was one, else the wait."""
+
+    def refund(self, key: Hashable, limit: RateLimit) -> None:
+        """Put back a token that ``hit`` took."""
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """Per-process buckets; the least recently used beyond ``maxsize`` are dropped.
+
+    A dropped bucket comes back full, so ``maxsize`` should comfortably exceed
+    the number of clients active within one refill period.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # key -> (tokens, monotonic time they were counted at)
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable, limit: RateLimit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = limit.burst
+            else:
+                tokens, counted_at = bucket
+                tokens = min(limit.burst, tokens + (now - counted_at) * limit.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens - 1 if wait == 0.0 else tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key: Hashable, limit: RateLimit) -> None:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            # a dropped bucket comes back full anyway
+            if bucket is not None:
+                tokens, counted_at = bucket
+                self._buckets[key] = (min(limit.burst, tokens + 1), counted_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, limits: dict[str, RateLimit | None]):
+        self.backend = backend
+        self.limits = limits
+
+    def check(self, *checks: tuple[str, Hashable]) -> None:
+        """Count a request against each ``(limit name, key)``; raise when over one.
+
+        A rejected request is not counted at all: tokens already taken from the
+        other buckets are refunded, so e.g. a login turned away by its username
+        limit does not also use up its client IP's budget.
+        """
+        taken: list[tuple[tuple[str, Hashable], RateLimit]] = []
+        for name, key in checks:
+            limit = self.limits.get(name)
+            if limit is None:
+                continue
+            wait = self.backend.hit((name, key), limit)
+            if wait:
+                for bucket, bucket_limit in taken:
+                    self.backend.refund(bucket, bucket_limit)
+                raise RateLimited(wait)
+            taken.append(((name, key), limit))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+def retry_after_header(exc: RateLimited) -> dict[str, str]:
+    return {"Retry-After": str(max(math.ceil(exc.retry_after), 1))}
+
+
+def _load_backend(settings: Settings) -> RateLimitBackend:
+    name = settings.RATE_LIMIT_BACKEND
+    if name == "memory":
+        return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    # "package.module:factory", called with the settings
+    module, _, attr = name.partition(":")
+    factory: Callable[[Settings], RateLimitBackend] = getattr(
+        importlib.import_module(module), attr
+    )
+    return factory(settings)
+
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter:
+    settings = get_settings()
+    limits = {
+        name: parse_limit(getattr(settings, attr))
+        if settings.RATE_LIMIT_ENABLED
+        else None
+        for name, attr in LIMITS.items()
+    }
+    return RateLimiter(_load_backend(settings), limits)
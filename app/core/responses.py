@@ -0,0 +1,15 @@
+import orjson
+from fastapi.responses import Response
+
+
+class FastJSONResponse(Response):
+    """orjson-encoded JSON for payloads built from plain dicts and rows.
+
+    UTC datetimes are written with a ``Z`` suffix, as pydantic does, so the
+    output matches what the response models would produce.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
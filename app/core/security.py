@@ -1,17 +1,63 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable
+
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.metrics import PASSWORD_HASHING
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashingBusy(RuntimeError):
+    """Every hashing worker is busy and the wait queue is full."""
+
+
+@lru_cache()
+def _hashing_pool() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    # bcrypt releases the GIL while hashing, so threads give real parallelism;
+    # the pool size caps how many cores a login burst can take from reads
+    settings = get_settings()
+    executor = ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+    )
+    slots = threading.BoundedSemaphore(
+        settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+    )
+    return executor, slots
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Any:
+    # only the bcrypt work itself, not the wait for a free worker
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        PASSWORD_HASHING.observe(time.perf_counter() - started, (fn.__name__,))
+
+
+def _run_hashing(fn: Callable[..., Any], *args: Any) -> Any:
+    executor, slots = _hashing_pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy("Password hashing pool is saturated")
+    try:
+        return executor.submit(_timed, fn, *args).result()
+    finally:
+        slots.release()
+
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(subject: str) -> str:
@@ -25,13 +71,36 @@ def create_access_token(subject: str) -> str:
     )
 
 
+@lru_cache()
+def get_token_cache() -> TTLCache:
+    """Verified token digest -> ``sub``; each entry lives until the token's ``exp``."""
+    settings = get_settings()
+    maxsize = settings.JWT_CACHE_SIZE if settings.JWT_CACHE_ENABLED else 0
+    return TTLCache(maxsize, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
 def decode_access_token(token: str) -> str | None:
+    cache = get_token_cache()
+    if cache.maxsize:
+        key = hashlib.sha256(token.encode()).digest()
+        sub = cache.get(key)
+        if sub is not None:
+            return sub
     try:
         settings = get_settings()
         payload = jwt.decode(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
         )
-        sub = payload.get("sub")
-        return str(sub) if sub is not None else None
     except JWTError:
         return None
+    sub = payload.get("sub")
+    if sub is None:
+        return None
+    sub = str(sub)
+    exp = payload.get("exp")
+    # tokens without exp never expire, so they are verified every time
+    if cache.maxsize and isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            cache.set(key, sub, ttl=remaining)
+    return sub
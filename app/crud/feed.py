@@ -0,0 +1,289 @@
+"""Follow graph and home timelines.
+
+New public posts are copied ("fanned out") into each follower's
+``timeline_entries`` by a background stage, so reading a feed page is one range
+scan of the reader's timeline. Authors with more than ``max_followers``
+followers are skipped by the fan-out and their recent posts are merged into
+their followers' pages at read time instead. When such an author drops back to
+``max_followers``, their latest posts are fanned out to catch up, since the
+read-time merge no longer covers them.
+"""
+
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import (
+    Insert,
+    Select,
+    Table,
+    delete,
+    literal,
+    select,
+    true,
+    tuple_,
+    union,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from app.crud.post import _invalidate_post_caches
+from app.crud.user import invalidate_user
+from app.models.follow import Follow, TimelineEntry
+from app.models.post import Post
+from app.models.user import User
+
+_TIMELINE_COLUMNS = ["user_id", "created_at", "post_id", "author_id"]
+
+
+def _insert_ignoring_duplicates(db: Session, table: Table) -> Insert:
+    # app.db.session.check_backend admits only these two at startup
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return sqlite.insert(table).on_conflict_do_nothing()
+
+
+def follow(
+    db: Session,
+    *,
+    follower_id: int,
+    followee_id: int,
+    backfill: int,
+    max_followers: int,
+) -> bool:
+    """Follow ``followee_id``; False when already following.
+
+    The followee's latest ``backfill`` public posts are copied into the
+    follower's timeline, unless they are merged in at read time anyway.
+    """
+    try:
+        created = db.execute(
+            _insert_ignoring_duplicates(db, Follow.__table__).values(
+                follower_id=follower_id, followee_id=followee_id
+            )
+        ).rowcount
+        if created:
+            followers = db.execute(
+                update(User)
+                .where(User.id == followee_id)
+                .values(follower_count=User.follower_count + 1)
+                .returning(User.follower_count)
+            ).scalar_one()
+            if backfill and followers <= max_followers:
+                latest = (
+                    select(
+                        literal(follower_id), Post.created_at, Post.id, Post.author_id
+                    )
+                    .where(Post.author_id == followee_id, Post.is_public)
+                    .order_by(Post.created_at.desc(), Post.id.desc())
+                    .limit(backfill)
+                )
+                db.execute(
+                    _insert_ignoring_duplicates(
+                        db, TimelineEntry.__table__
+                    ).from_select(_TIMELINE_COLUMNS, latest)
+                )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return bool(created)
+
+
+def unfollow(
+    db: Session,
+    *,
+    follower_id: int,
+    followee_id: int,
+    backfill: int,
+    max_followers: int,
+) -> bool:
+    """Stop following ``followee_id`` and drop their posts from the timeline."""
+    try:
+        deleted = db.execute(
+            delete(Follow).where(
+                Follow.follower_id == follower_id, Follow.followee_id == followee_id
+            )
+        ).rowcount
+        if deleted:
+            followers = db.execute(
+                update(User)
+                .where(User.id == followee_id)
+                .values(follower_count=User.follower_count - 1)
+                .returning(User.follower_count)
+            ).scalar_one()
+            # within one user's key range, so bounded by the timeline's size
+            db.execute(
+                delete(TimelineEntry).where(
+                    TimelineEntry.user_id == follower_id,
+                    TimelineEntry.author_id == followee_id,
+                )
+            )
+            if followers == max_followers:
+                _catch_up(db, [followee_id], backfill, max_followers)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return bool(deleted)
+
+
+def delete_user(
+    db: Session, user_id: int, *, backfill: int, max_followers: int
+) -> bool:
+    """Delete ``user_id`` and, by cascade, their posts; False if there was none.
+
+    Their follows go by cascade too, but nothing there decrements the
+    followees' ``follower_count``; that is done here first.
+    """
+    try:
+        posts = db.execute(
+            select(Post.id, Post.is_public).where(Post.author_id == user_id)
+        ).all()
+        _drop_follows(db, user_id, backfill, max_followers)
+        deleted = db.execute(delete(User).where(User.id == user_id)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_user(user_id)
+    _invalidate_post_caches(
+        user_id,
+        touches_public=any(public for _, public in posts),
+        post_ids=[post_id for post_id, _ in posts],
+    )
+    return bool(deleted)
+
+
+def _drop_follows(db: Session, user_id: int, backfill: int, max_followers: int) -> None:
+    counts = db.execute(
+        update(User)
+        .where(
+            User.id.in_(select(Follow.followee_id).where(Follow.follower_id == user_id))
+        )
+        .values(follower_count=User.follower_count - 1)
+        .returning(User.id, User.follower_count)
+    ).all()
+    db.execute(delete(Follow).where(Follow.follower_id == user_id))
+    _catch_up(
+        db,
+        [author_id for author_id, followers in counts if followers == max_followers],
+        backfill,
+        max_followers,
+    )
+
+
+def _catch_up(
+    db: Session, author_ids: list[int], backfill: int, max_followers: int
+) -> None:
+    # authors back at the limit: posts made while above it were never fanned
+    # out and are no longer merged at read time
+    for author_id in author_ids:
+        latest = (
+            select(Post.id)
+            .where(Post.author_id == author_id, Post.is_public)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(backfill)
+        )
+        _deliver(db, latest, max_followers)
+
+
+def _deliver(db: Session, post_ids: list[int] | Select, max_followers: int) -> int:
+    entries = (
+        select(Follow.follower_id, Post.created_at, Post.id, Post.author_id)
+        .join(Follow, Follow.followee_id == Post.author_id)
+        .join(User, User.id == Post.author_id)
+        .where(
+            Post.id.in_(post_ids),
+            Post.is_public,
+            User.follower_count <= max_followers,
+        )
+    )
+    return db.execute(
+        _insert_ignoring_duplicates(db, TimelineEntry.__table__).from_select(
+            _TIMELINE_COLUMNS, entries
+        )
+    ).rowcount
+
+
+def fan_out_posts(db: Session, post_ids: Iterable[int], max_followers: int) -> int:
+    """Copy public ``post_ids`` into their authors' followers' timelines.
+
+    One ``INSERT ... SELECT`` for the whole batch; posts already delivered
+    (e.g. queued again by an edit) are skipped. Returns the entries written.
+    """
+    try:
+        written = _deliver(db, list(post_ids), max_followers)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def feed_statement(
+    db: Session,
+    *,
+    user_id: int,
+    limit: int,
+    cursor: tuple[datetime, int] | None,
+    max_followers: int,
+) -> Select:
+    """The page query behind :func:`get_feed`.
+
+    A UNION of the reader's timeline page and, for followed authors above
+    ``max_followers``, their newest public posts; each part reads at most one
+    page from an index in feed order.
+    """
+    timeline = (
+        select(Post)
+        .join(TimelineEntry, TimelineEntry.post_id == Post.id)
+        .where(TimelineEntry.user_id == user_id, Post.is_public)
+    )
+    if cursor is not None:
+        timeline = timeline.where(
+            tuple_(TimelineEntry.created_at, TimelineEntry.post_id) < tuple_(*cursor)
+        )
+    timeline = timeline.order_by(
+        TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc()
+    ).limit(limit)
+
+    authors = (
+        select(Follow.followee_id)
+        .join(User, User.id == Follow.followee_id)
+        .where(Follow.follower_id == user_id, User.follower_count > max_followers)
+        .subquery()
+    )
+    recent = select(Post.id).where(Post.is_public)
+    if cursor is not None:
+        recent = recent.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+    recent = recent.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+    if db.get_bind().dialect.name == "postgresql":
+        # one page per author off ix_posts_author_created_at_id
+        per_author = recent.where(Post.author_id == authors.c.followee_id).lateral()
+        pulled_ids = (
+            select(per_author.c.id).select_from(authors).join(per_author, true())
+        )
+    else:
+        pulled_ids = recent.where(Post.author_id.in_(select(authors.c.followee_id)))
+    pulled = select(Post).where(Post.id.in_(pulled_ids))
+
+    # UNION drops posts delivered both ways (an author who crossed the limit)
+    merged = union(select(timeline.subquery()), select(pulled.subquery())).subquery()
+    post = aliased(Post, merged)
+    return select(post).order_by(post.created_at.desc(), post.id.desc()).limit(limit)
+
+
+def get_feed(
+    db: Session,
+    *,
+    user_id: int,
+    limit: int = 20,
+    cursor: tuple[datetime, int] | None = None,
+    max_followers: int,
+) -> list[Post]:
+    """One page of ``user_id``'s home timeline, newest first."""
+    stmt = feed_statement(
+        db, user_id=user_id, limit=limit, cursor=cursor, max_followers=max_followers
+    )
+    return list(db.scalars(stmt))
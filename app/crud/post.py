@@ -1,8 +1,178 @@
-from sqlalchemy.orm import Session
+import hashlib
+import operator
+from dataclasses import dataclass, field as dataclass_field, replace
+from datetime import datetime
+from functools import lru_cache, reduce
+from typing import Callable, Iterable, Iterator, Sequence
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, selectinload
+from app.core.cache import Generation, SingleFlight, TTLCache
+from app.core.compression import compress
+from app.core.config import get_settings
 from app.models.post import Post
 from app.models.user import User
-from app.schemas.post import PostCreate, PostUpdate
-from sqlalchemy import func
+from app.crud.user import UserSnapshot
+from app.schemas.post import (
+    PostCreate,
+    PostUpdate,
+    PostRead,
+    PostReadWithAuthor,
+    TotalMode,
+)
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    bindparam,
+    Double,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    table,
+    select,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+
+
+@lru_cache()
+def get_count_cache() -> TTLCache:
+    settings = get_settings()
+    return TTLCache(
+        settings.POST_COUNT_CACHE_SIZE, settings.POST_COUNT_CACHE_TTL_SECONDS
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPost:
+    """Serialized ``PostRead`` body plus what the visibility check needs."""
+
+    id: int
+    author_id: int
+    is_public: bool
+    etag: str
+    body: bytes
+    # compressed forms of body, filled on first use and dropped with the entry
+    compressed: dict[str, bytes] = dataclass_field(default_factory=dict, compare=False)
+    # the ``expand=author`` rendering, made on its first request
+    with_author: "CachedPost | None" = dataclass_field(default=None, compare=False)
+
+    def encoded(self, encoding: str) -> bytes:
+        data = self.compressed.get(encoding)
+        if data is None:
+            data = self.compressed[encoding] = compress(self.body, encoding)
+        return data
+
+
+@lru_cache()
+def get_post_cache() -> TTLCache:
+    settings = get_settings()
+    return TTLCache(settings.POST_CACHE_SIZE, settings.POST_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPage:
+    """A rendered anonymous ``GET /api/posts`` response body."""
+
+    etag: str
+    body: bytes
+    compressed: dict[str, bytes] = dataclass_field(default_factory=dict, compare=False)
+
+    def encoded(self, encoding: str) -> bytes:
+        data = self.compressed.get(encoding)
+        if data is None:
+            data = self.compressed[encoding] = compress(self.body, encoding)
+        return data
+
+
+@lru_cache()
+def get_page_cache() -> TTLCache:
+    settings = get_settings()
+    return TTLCache(settings.POST_PAGE_CACHE_SIZE, settings.POST_PAGE_CACHE_TTL_SECONDS)
+
+
+@lru_cache()
+def get_public_generation() -> Generation:
+    """Bumped by every write that public lists can show; part of page keys."""
+    return Generation()
+
+
+_page_flights = SingleFlight()
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def page_cache_key(key: tuple) -> tuple:
+    """``key`` under the current generation; public writes retire it."""
+    return (get_public_generation().value, *key)
+
+
+def store_page(key: tuple, body: bytes) -> CachedPage:
+    page = CachedPage(etag=_etag(body), body=body)
+    get_page_cache().set(key, page)
+    return page
+
+
+def get_page_cached(key: tuple, render: Callable[[], bytes]) -> CachedPage:
+    """Read-through for anonymous list pages under the current generation.
+
+    Concurrent misses for one key render once; the others wait for that result.
+    """
+    cache = get_page_cache()
+    key = page_cache_key(key)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    def build() -> CachedPage:
+        # a flight for this key may have finished since the lookup above
+        page = cache.get(key)
+        if page is None:
+            page = store_page(key, render())
+        return page
+
+    return _page_flights.do(key, build)
+
+
+# Session.info flag for reads that must see the session user's own writes
+SKIP_READ_CACHES = "skip_read_caches"
+
+
+def skips_read_caches(db: Session) -> bool:
+    """Whether ``db`` reads past the caches (and refreshes what it reads).
+
+    Set for users who wrote recently: a read from a lagging replica may have
+    put the pre-write state back into the cache after the write cleared it.
+    """
+    return db.info.get(SKIP_READ_CACHES, False)
+
+
+def _invalidate_post_caches(
+    author_id: int, touches_public: bool, post_ids: Iterable[int] = ()
+) -> None:
+    """Forget cached state that a write to ``author_id``'s posts changed."""
+    if touches_public:
+        get_public_generation().bump()
+    post_cache = get_post_cache()
+    for post_id in post_ids:
+        post_cache.pop(post_id)
+
+    def stale(key: tuple) -> bool:
+        if key[0] == "public":
+            return touches_public
+        # every viewer scope includes the public posts as well
+        return key[1] == author_id or (touches_public and key[0] == "viewer")
+
+    get_count_cache().prune(stale)
 
 
 def create_post(
@@ -23,43 +193,334 @@ def create_post(
     except Exception:
         db.rollback()
         raise
+    # one reload after the commit expired it, before reading its attributes
     db.refresh(post)
+    _invalidate_post_caches(author_id, touches_public=post.is_public)
     return post
 
 
+def _count_scope(
+    current_user: UserSnapshot | None, mine: bool, is_public: bool | None
+) -> tuple:
+    """Cache key naming the set of posts a visibility filter selects."""
+    if current_user is None:
+        return ("public",)
+    if mine:
+        return ("author", current_user.id, is_public)
+    if is_public is True:
+        return ("public",)
+    if is_public is False:  # public-or-mine narrowed to private is just mine
+        return ("author", current_user.id, False)
+    return ("viewer", current_user.id)
+
+
+# below this many rows an exact COUNT is cheap and estimates are least reliable
+_ESTIMATE_MIN_ROWS = 1000
+
+
+def _estimate_count(db: Session, criteria: ColumnElement[bool]) -> int | None:
+    """Row estimate from planner statistics.
+
+    None when the table was never analyzed or the estimate is under
+    ``_ESTIMATE_MIN_ROWS``; the caller counts exactly then.
+    """
+    bind = db.get_bind()
+    estimate = None
+    if bind.dialect.name == "postgresql":
+        # -1 until the first VACUUM / ANALYZE; the planner then guesses from
+        # the table's size on disk
+        reltuples = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": Post.__tablename__},
+        ).scalar()
+        if reltuples is None or reltuples < 0:
+            return None
+        compiled = select(Post.id).where(criteria).compile(dialect=bind.dialect)
+        plan = (
+            db.connection()
+            .exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params
+            )
+            .scalar()
+        )
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+    elif bind.dialect.name == "sqlite":
+        has_stats = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        ).first()
+        if has_stats:
+            stat = db.execute(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = 'posts' LIMIT 1")
+            ).scalar()
+            if stat:
+                estimate = int(stat.split()[0])
+    if estimate is None or estimate < _ESTIMATE_MIN_ROWS:
+        return None
+    return estimate
+
+
+def _exact_count(db: Session, branches: list[list[ColumnElement[bool]]]) -> int:
+    # branches are disjoint, so their counts add up; each one stays index-friendly
+    counts = [
+        select(func.count()).select_from(Post).where(*branch).scalar_subquery()
+        for branch in branches
+    ]
+    return db.scalar(select(reduce(operator.add, counts))) or 0
+
+
+def _count_posts(
+    db: Session,
+    branches: list[list[ColumnElement[bool]]],
+    total_mode: TotalMode,
+    scope: tuple,
+) -> tuple[int | None, TotalMode]:
+    if total_mode == "none":
+        return None, "none"
+    if total_mode == "estimated":
+        estimate = _estimate_count(db, _any_branch(branches))
+        if estimate is not None:
+            return estimate, "estimated"
+        total_mode = "exact"  # no usable statistics
+    if total_mode == "cached":
+        cache = get_count_cache()
+        total = None if skips_read_caches(db) else cache.get(scope)
+        if total is None:
+            total = _exact_count(db, branches)
+            cache.set(scope, total)
+        return total, "cached"
+    return _exact_count(db, branches), "exact"
+
+
+def _visibility_branches(
+    current_user: UserSnapshot | None, mine: bool, is_public: bool | None
+) -> list[list[ColumnElement[bool]]]:
+    """Visibility as disjoint OR-ed branches of AND-ed criteria.
+
+    Each branch lines up with one index (the partial public index or the
+    author composite), so a viewer's "public or mine" feed runs as a UNION ALL
+    of two ordered index scans rather than an OR filter the planner can only
+    serve with a full scan and sort.
+    """
+    # plain boolean terms so the planner can match the partial public index
+    public = [Post.is_public]
+    if current_user is None:  # Not sign in only public
+        return [public]
+    # sign in
+    if mine:  # only mine public and private
+        branch = [Post.author_id == current_user.id]
+        if is_public is not None:  # filter by public
+            branch.append(Post.is_public if is_public else ~Post.is_public)
+        return [branch]
+    # all public and my private
+    my_private = [Post.author_id == current_user.id, ~Post.is_public]
+    if is_public is True:
+        return [public]
+    if is_public is False:
+        return [my_private]
+    return [public, my_private]
+
+
+def _any_branch(branches: list[list[ColumnElement[bool]]]) -> ColumnElement[bool]:
+    return or_(*(and_(*branch) for branch in branches))
+
+
+def _visibility_criteria(
+    current_user: UserSnapshot | None, mine: bool, is_public: bool | None
+) -> ColumnElement[bool]:
+    return _any_branch(_visibility_branches(current_user, mine, is_public))
+
+
+def visible_posts_statement(
+    current_user: UserSnapshot | None,
+    *,
+    skip: int = 0,
+    limit: int = 20,
+    mine: bool = False,
+    is_public: bool | None = None,
+    cursor: tuple[datetime, int] | None = None,
+    fields: Sequence[str] | None = None,
+    rows: bool = False,
+    expand_author: bool = False,
+) -> Select:
+    """The page query behind :func:`get_visible_posts`.
+
+    ``fields`` restricts the loaded columns, leaving the rest deferred; ``id``
+    and ``created_at`` are always loaded for ordering and the next cursor.
+    With ``rows`` the statement selects plain columns instead of ``Post``.
+    ``expand_author`` loads ``Post.author`` for the whole page with one
+    ``selectinload`` query, or for rows joins ``author_username`` in.
+    """
+
+    def newest_first(stmt: Select, entity=Post) -> Select:
+        return stmt.order_by(entity.created_at.desc(), entity.id.desc())
+
+    if fields is not None:
+        required = (
+            ("id", "created_at", "author_id") if expand_author else ("id", "created_at")
+        )
+        fields = [*required, *(f for f in fields if f not in required)]
+
+    def select_fields(entity=Post) -> Select:
+        if rows:
+            names = fields or Post.__table__.columns.keys()
+            return select(*(getattr(entity, f) for f in names))
+        if fields is None:
+            return select(entity)
+        return select(entity).options(load_only(*(getattr(entity, f) for f in fields)))
+
+    criteria_list = _visibility_branches(current_user, mine, is_public)
+    branches = []
+    for criteria in criteria_list:
+        if fields is None or len(criteria_list) == 1:
+            stmt = select_fields()
+        else:  # union members are plain columns so the big ones stay unread
+            stmt = select(*(getattr(Post, f) for f in fields))
+        stmt = stmt.where(*criteria)
+        if cursor is not None:  # keyset: continue right after the last seen row
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+        branches.append(newest_first(stmt))
+
+    entity = Post
+    if len(branches) == 1:
+        stmt = branches[0]
+    else:
+        # every branch yields at most one page (plus the skipped rows), and the
+        # planner merges the already ordered results without sorting
+        window = limit if cursor is not None else skip + limit
+        merged = union_all(
+            *(select(branch.limit(window).subquery()) for branch in branches)
+        ).subquery()
+        entity = aliased(Post, merged)
+        stmt = newest_first(select_fields(entity), entity)
+
+    if expand_author and rows:
+        stmt = stmt.join(User, User.id == entity.author_id).add_columns(
+            User.username.label("author_username")
+        )
+    elif expand_author:
+        stmt = stmt.options(
+            selectinload(entity.author).load_only(User.id, User.username)
+        )
+
+    if cursor is None:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
 def get_visible_posts(
     db: Session,
     *,
-    current_user: User | None,
+    current_user: UserSnapshot | None,
     skip: int = 0,
     limit: int = 20,
     mine: bool = False,
     is_public: bool | None = None,
-) -> list[Post]:
-    query = db.query(Post)
+    cursor: tuple[datetime, int] | None = None,
+    total_mode: TotalMode = "exact",
+    fields: Sequence[str] | None = None,
+    rows: bool = False,
+    expand_author: bool = False,
+) -> tuple[list[Post] | list[Row], int | None, TotalMode]:
+    """One page of visible posts plus the total.
 
-    if current_user is None:  # Not sign in only public
-        query = query.filter(Post.is_public.is_(True))
-    else:  # sign in
-        if mine:  # only mine public and private
-            query = query.filter(Post.author_id == current_user.id)
-        else:  # all public and my private
-            query = query.filter(
-                (Post.is_public.is_(True)) | (Post.author_id == current_user.id)
-            )
+    With ``rows`` the page is Core rows (attribute access like ``Post``, no ORM
+    identity map or per-object state), for callers that serialize directly.
+    """
+    total, total_mode = _count_posts(
+        db,
+        _visibility_branches(current_user, mine, is_public),
+        total_mode,
+        _count_scope(current_user, mine, is_public),
+    )
+    stmt = visible_posts_statement(
+        current_user,
+        skip=skip,
+        limit=limit,
+        mine=mine,
+        is_public=is_public,
+        cursor=cursor,
+        fields=fields,
+        rows=rows,
+        expand_author=expand_author,
+    )
+    if rows:
+        return list(db.execute(stmt)), total, total_mode
+    return list(db.scalars(stmt)), total, total_mode
 
-        if is_public is not None:  # filter by public
-            query = query.filter(Post.is_public.is_(is_public))
 
-    total = query.with_entities(func.count()).scalar() or 0
+def iter_visible_posts(
+    db: Session,
+    *,
+    current_user: UserSnapshot | None,
+    mine: bool = False,
+    is_public: bool | None = None,
+    batch_size: int = 1000,
+) -> Iterator[Row]:
+    """Stream every visible post, newest first, as plain rows.
+
+    Rows come from a server-side cursor ``batch_size`` at a time, so memory does
+    not grow with the number of posts.
+    """
+    stmt = (
+        select(*Post.__table__.columns)
+        .where(_visibility_criteria(current_user, mine, is_public))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(stmt)
+
+
+def _fts5_query(q: str) -> str:
+    # quote every term so user input can't hit FTS5 query syntax; terms are ANDed
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def search_posts(
+    db: Session,
+    *,
+    q: str,
+    current_user: UserSnapshot | None,
+    limit: int = 20,
+    mine: bool = False,
+    is_public: bool | None = None,
+    cursor: tuple[float, int] | None = None,
+) -> list[tuple[Post, float]]:
+    """Full-text search over title and content, best match first.
 
-    query = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+    Postgres matches the generated ``posts.search_vector`` column (GIN index);
+    SQLite matches the ``posts_fts`` FTS5 table. Both are created by the
+    ``post_search`` migration. ``rank`` is higher for better matches.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        vector = literal_column("posts.search_vector")
+        # float8 so the rank survives the round trip through the cursor exactly
+        rank = cast(func.ts_rank_cd(vector, tsquery), Double)
+        query = db.query(Post, rank.label("rank")).filter(vector.op("@@")(tsquery))
+    else:  # SQLite, the only other backend app.db.session.check_backend admits
+        match = _fts5_query(q)
+        if not match:
+            # an empty MATCH is an FTS5 syntax error; no terms match nothing
+            return []
+        fts = table("posts_fts", column("rowid"))
+        # bm25 is lower for better matches; title hits weigh double
+        rank = -func.bm25(literal_column("posts_fts"), 2.0, 1.0)
+        query = (
+            db.query(Post, rank.label("rank"))
+            .join(fts, fts.c.rowid == Post.id)
+            .filter(literal_column("posts_fts").op("MATCH")(match))
+        )
 
-    return query, total
+    query = query.filter(_visibility_criteria(current_user, mine, is_public))
+    if cursor is not None:
+        query = query.filter(tuple_(rank, Post.id) < tuple_(*cursor))
+    rows = query.order_by(rank.desc(), Post.id.desc()).limit(limit).all()
+    return [(post, float(score)) for post, score in rows]
 
 
 def update_post(db: Session, *, post: Post, post_in: PostUpdate) -> Post:
     update_data = post_in.model_dump(exclude_unset=True)
+    was_public = post.is_public
 
     for field, value in update_data.items():
         setattr(post, field, value)
@@ -70,17 +531,200 @@ def update_post(db: Session, *, post: Post, post_in: PostUpdate) -> Post:
         db.rollback()
         raise
     db.refresh(post)
+    _invalidate_post_caches(
+        post.author_id, touches_public=was_public or post.is_public, post_ids=(post.id,)
+    )
     return post
 
 
-def get_post(db: Session, post_id: int) -> Post | None:
-    return db.query(Post).filter(Post.id == post_id).first()
+def get_post(db: Session, post_id: int, expand_author: bool = False) -> Post | None:
+    query = db.query(Post).filter(Post.id == post_id)
+    if expand_author:
+        query = query.options(joinedload(Post.author).load_only(User.id, User.username))
+    return query.first()
+
+
+def render_post(post: Post, model: type[PostRead] = PostRead) -> CachedPost:
+    body = model.model_validate(post).model_dump_json().encode()
+    # strong validator over the full representation (id, updated_at, fields)
+    return CachedPost(
+        id=post.id,
+        author_id=post.author_id,
+        is_public=post.is_public,
+        etag=_etag(body),
+        body=body,
+    )
+
+
+def get_post_cached(
+    db: Session, post_id: int, expand_author: bool = False
+) -> CachedPost | None:
+    """Read-through: only a cache miss touches the database.
+
+    The ``expand_author`` rendering hangs off the plain entry, so it is
+    invalidated with it; the author comes joined into the same query.
+    """
+    entry = None
+    if not skips_read_caches(db):
+        entry = lookup_post(post_id, expand_author=expand_author)
+    if entry is None:
+        post = get_post(db, post_id, expand_author=expand_author)
+        if post is None:
+            return None
+        entry = cache_post(post, expand_author=expand_author)
+    return entry
+
+
+def lookup_post(post_id: int, expand_author: bool = False) -> CachedPost | None:
+    """The cached rendering of ``post_id``, or None on a miss."""
+    entry = get_post_cache().get(post_id)
+    if entry is None or (expand_author and entry.with_author is None):
+        return None
+    return entry.with_author if expand_author else entry
+
+
+def cache_post(post: Post, expand_author: bool = False) -> CachedPost:
+    """Render ``post`` into the cache; ``post.author`` must be loaded to expand."""
+    entry = render_post(post)
+    if expand_author:
+        entry = replace(entry, with_author=render_post(post, PostReadWithAuthor))
+    get_post_cache().set(post.id, entry)
+    return entry.with_author if expand_author else entry
 
 
 def delete_post(db: Session, *, post: Post) -> None:
+    post_id, author_id, was_public = post.id, post.author_id, post.is_public
     try:
         db.delete(post)
         db.commit()
     except Exception:
         db.rollback()
         raise
+    _invalidate_post_caches(author_id, touches_public=was_public, post_ids=(post_id,))
+
+
+def get_post_owners(db: Session, post_ids: list[int]) -> dict[int, tuple[int, bool]]:
+    """``id -> (author_id, is_public)`` for whichever of ``post_ids`` exist."""
+    rows = db.execute(
+        select(Post.id, Post.author_id, Post.is_public).where(Post.id.in_(post_ids))
+    )
+    return {post_id: (author_id, public) for post_id, author_id, public in rows}
+
+
+def _load_posts(db: Session, post_ids: list[int]) -> list[Post]:
+    posts = {p.id: p for p in db.scalars(select(Post).where(Post.id.in_(post_ids)))}
+    return [posts[post_id] for post_id in post_ids]
+
+
+def create_posts(
+    db: Session, *, posts_in: list[PostCreate], author_id: int
+) -> list[Post]:
+    """Insert many posts with one batched ``INSERT ... RETURNING``."""
+    rows = [{**post_in.model_dump(), "author_id": author_id} for post_in in posts_in]
+    try:
+        post_ids = list(
+            db.scalars(
+                insert(Post).returning(Post.id, sort_by_parameter_order=True), rows
+            )
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _invalidate_post_caches(
+        author_id, touches_public=any(post_in.is_public for post_in in posts_in)
+    )
+    return _load_posts(db, post_ids)
+
+
+def update_posts(
+    db: Session, *, updates: dict[int, PostUpdate], author_id: int, was_public: bool
+) -> list[Post]:
+    """Bulk UPDATE by primary key; ``was_public`` if any target was public."""
+    # None means "leave as is" here; the columns themselves are NOT NULL
+    rows = [
+        {**post_in.model_dump(exclude_unset=True, exclude_none=True), "id": post_id}
+        for post_id, post_in in updates.items()
+    ]
+    # rows sharing the same columns go out as one executemany
+    rows.sort(key=sorted)
+    try:
+        db.execute(update(Post), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    touches_public = was_public or any(
+        post_in.is_public for post_in in updates.values()
+    )
+    _invalidate_post_caches(author_id, touches_public, post_ids=updates)
+    return _load_posts(db, list(updates))
+
+
+def delete_posts(
+    db: Session, *, post_ids: list[int], author_id: int, was_public: bool
+) -> None:
+    try:
+        db.execute(
+            delete(Post).where(Post.id.in_(post_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _invalidate_post_caches(author_id, was_public, post_ids=post_ids)
+
+
+def get_post_contents(db: Session, post_ids: Iterable[int]) -> dict[int, str]:
+    rows = db.execute(select(Post.id, Post.content).where(Post.id.in_(list(post_ids))))
+    return {post_id: content for post_id, content in rows}
+
+
+def summary_backfill_ids(
+    db: Session, *, after_id: int, limit: int, missing_only: bool = True
+) -> list[int]:
+    """The next ``limit`` post ids above ``after_id``, in id order."""
+    stmt = select(Post.id).where(Post.id > after_id).order_by(Post.id).limit(limit)
+    if missing_only:
+        stmt = stmt.where(Post.summary.is_(None))
+    return list(db.scalars(stmt))
+
+
+def write_summaries(db: Session, summaries: dict[int, str]) -> None:
+    """Bulk-set ``Post.summary``; ``updated_at`` is kept as it was."""
+    if not summaries:
+        return
+    posts = Post.__table__
+    stmt = (
+        update(posts)
+        .where(posts.c.id == bindparam("post_id"))
+        # an explicit value stops the onupdate=now() default from firing
+        .values(summary=bindparam("new_summary"), updated_at=posts.c.updated_at)
+    )
+    try:
+        db.execute(
+            stmt,
+            [
+                {"post_id": post_id, "new_summary": summary}
+                for post_id, summary in summaries.items()
+            ],
+        )
+        # list items carry the summary, so only public posts change cached pages
+        touches_public = (
+            db.scalar(
+                select(posts.c.id)
+                .where(posts.c.id.in_(list(summaries)), posts.c.is_public)
+                .limit(1)
+            )
+            is not None
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    post_cache = get_post_cache()
+    for post_id in summaries:
+        post_cache.pop(post_id)
+    if touches_public:
+        get_public_generation().bump()
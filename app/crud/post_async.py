@@ -0,0 +1,46 @@
+"""AsyncSession reads behind the ``async def`` post routes.
+
+Only the database round trips are awaited here; rendering and the caches stay
+in :mod:`app.crud.post`, so both kinds of route serve the same entries.
+"""
+
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import AsyncSingleFlight
+from app.crud import post as post_crud
+from app.models.post import Post
+
+
+async def get_post(
+    db: AsyncSession, post_id: int, expand_author: bool = False
+) -> Post | None:
+    return await db.run_sync(
+        lambda session: post_crud.get_post(
+            session, post_id, expand_author=expand_author
+        )
+    )
+
+
+# the threaded SingleFlight would block the event loop while a flight runs
+_page_flights = AsyncSingleFlight()
+
+
+async def get_page_cached(
+    key: tuple, render: Callable[[], Awaitable[bytes]]
+) -> post_crud.CachedPage:
+    """:func:`app.crud.post.get_page_cached` for an awaitable ``render``."""
+    cache = post_crud.get_page_cache()
+    key = post_crud.page_cache_key(key)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    async def build() -> post_crud.CachedPage:
+        page = cache.get(key)
+        if page is None:
+            page = post_crud.store_page(key, await render())
+        return page
+
+    return await _page_flights.do(key, build)
@@ -1,11 +1,49 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import get_settings
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Detached copy of the user columns the auth dependencies need."""
+
+    id: int
+    username: str
+    is_active: bool
+
+
+@lru_cache()
+def get_user_cache() -> TTLCache:
+    settings = get_settings()
+    return TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int) -> None:
+    get_user_cache().pop(user_id)
+
+
+def get_user_snapshot(db: Session, user_id: int) -> UserSnapshot | None:
+    cache = get_user_cache()
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(
+            id=user.id, username=user.username, is_active=user.is_active
+        )
+        cache.set(user_id, snapshot)
+    return snapshot
+
+
 def get_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
@@ -22,5 +60,7 @@ def create_user(db: Session, user_in: UserCreate):
     except IntegrityError:
         db.rollback()
         raise
+    # one reload after the commit expired it, before reading its attributes
     db.refresh(user)
+    invalidate_user(user.id)
     return user
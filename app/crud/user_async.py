@@ -0,0 +1,20 @@
+"""AsyncSession variants of :mod:`app.crud.user`."""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.user import UserSnapshot, get_user_cache
+from app.models.user import User
+
+
+async def get_user_snapshot(db: AsyncSession, user_id: int) -> UserSnapshot | None:
+    cache = get_user_cache()
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(
+            id=user.id, username=user.username, is_active=user.is_active
+        )
+        cache.set(user_id, snapshot)
+    return snapshot
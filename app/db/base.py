@@ -1,4 +1,5 @@
 from app.db.base_class import Base  # noqa: F401
 
+from app.models.follow import Follow, TimelineEntry  # noqa: F401
 from app.models.post import Post  # noqa: F401
 from app.models.user import User  # noqa: F401
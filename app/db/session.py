@@ -1,15 +1,196 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import threading
+import time
+
+from sqlalchemy import create_engine, exc, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import get_settings
+from app.core.metrics import instrument_engine
 
 engine = None
 SessionLocal = None
 
+async_engine = None
+AsyncSessionLocal = None
+
+# read replicas from DATABASE_READ_URLS, handed out round-robin
+read_engines = []
+_read_sessionmakers = None
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+# full-text search and the timeline inserts have one implementation per backend
+SUPPORTED_BACKENDS = ("postgresql", "sqlite")
+
+
+class PoolStats:
+    """Checkout counters shared by every pool of one kind (sync or async)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self, pool: Pool | None) -> dict:
+        stats = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": 1000 * self.wait_total / self.checkouts
+            if self.checkouts
+            else 0.0,
+            "wait_ms_max": 1000 * self.wait_max,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                # overflow() counts up from -size while the pool fills
+                overflow_in_use=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        return stats
+
+
+class _TimedCheckout:
+    stats: PoolStats
+
+    def _do_get(self):
+        # time spent waiting for a free connection, or opening an overflow one
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return entry
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+def _pool_options(database_url: str, poolclass: type[Pool]) -> dict:
+    settings = get_settings()
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # in-memory SQLite keeps its single-connection pool
+        return options
+    return {
+        **options,
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def check_backend(database_url: str) -> None:
+    """Refuse to start on a database the queries were not written for."""
+    backend = make_url(database_url).get_backend_name()
+    if backend not in SUPPORTED_BACKENDS:
+        raise RuntimeError(
+            f"Unsupported database backend {backend!r}; "
+            f"use one of {', '.join(SUPPORTED_BACKENDS)}"
+        )
+
 
 def init_engine(database_url: str):
     global engine, SessionLocal
-    engine = create_engine(database_url, pool_pre_ping=True)
+    check_backend(database_url)
+    engine = create_engine(
+        database_url, **_pool_options(database_url, InstrumentedQueuePool)
+    )
+    instrument_engine(engine)
     SessionLocal = sessionmaker(
         autocommit=False,
         autoflush=False,
         bind=engine,
     )
+
+
+def init_read_engines(database_urls: list[str]):
+    global read_engines, _read_sessionmakers
+    for url in database_urls:
+        check_backend(url)
+    for read_engine in read_engines:
+        read_engine.dispose()
+    read_engines = [
+        # a pool class of its own per replica keeps the checkout counters apart
+        create_engine(url, **_pool_options(url, _replica_pool_class()))
+        for url in database_urls
+    ]
+    for read_engine in read_engines:
+        instrument_engine(read_engine)
+    _read_sessionmakers = None
+    if read_engines:
+        _read_sessionmakers = itertools.cycle(
+            [
+                sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+                for read_engine in read_engines
+            ]
+        )
+
+
+def _replica_pool_class() -> type[Pool]:
+    return type(
+        "InstrumentedReplicaPool", (InstrumentedQueuePool,), {"stats": PoolStats()}
+    )
+
+
+def ReadSessionLocal() -> Session | None:
+    """A session on the next replica, or ``None`` when none are configured."""
+    if _read_sessionmakers is None:
+        return None
+    return next(_read_sessionmakers)()
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap a sync driver (psycopg2, pysqlite) for its asyncio counterpart."""
+    url = make_url(database_url)
+    if url.get_driver_name() in ("asyncpg", "aiosqlite"):
+        return database_url
+    drivername = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise RuntimeError(f"No async driver known for {url.get_backend_name()}")
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def init_async_engine(database_url: str):
+    global async_engine, AsyncSessionLocal
+    async_url = to_async_url(database_url)
+    async_engine = create_async_engine(
+        async_url, **_pool_options(async_url, InstrumentedAsyncQueuePool)
+    )
+    # nothing may lazy-load after commit outside the greenlet, so keep attributes
+    AsyncSessionLocal = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=async_engine,
+    )
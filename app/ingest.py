@@ -0,0 +1,434 @@
+"""Bulk loading of users and posts from JSONL or CSV files.
+
+Records are streamed from the input, validated against the API schemas and
+written one chunk per transaction: ``COPY ... FROM STDIN`` on PostgreSQL
+(psycopg2), a Core executemany everywhere else. After every commit a
+checkpoint file records the byte offset reached, so an interrupted run resumes
+after the last committed chunk, and memory use depends on the chunk size only.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import Connection, Table, insert, select
+
+from app.core.security import get_password_hash
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.post import PostCreate
+from app.schemas.user import UserBase, UserCreate
+from app.workers.summary import make_excerpt
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+KINDS = ("posts", "users")
+FORMATS = ("jsonl", "csv")
+
+POST_COLUMNS = (
+    "title",
+    "content",
+    "is_public",
+    "author_id",
+    "summary",
+    "created_at",
+    "updated_at",
+)
+USER_COLUMNS = ("username", "hashed_password", "is_active")
+
+
+class IngestError(Exception):
+    pass
+
+
+class PostRecord(PostCreate):
+    """A post line: ``PostCreate`` plus its author and, optionally, its age."""
+
+    author_id: int | None = None
+    author: str | None = None
+    created_at: datetime | None = None
+
+
+class UserRecord(UserBase):
+    """A user line with either a plain ``password`` or a ``hashed_password``."""
+
+    password: str | None = None
+    hashed_password: str | None = None
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one input file, saved after every committed chunk."""
+
+    kind: str
+    offset: int = 0
+    line: int = 0
+    rows: int = 0
+    rejected: int = 0
+
+    @classmethod
+    def load(cls, path: Path, kind: str) -> "Checkpoint":
+        if not path.exists():
+            return cls(kind=kind)
+        checkpoint = cls(**json.loads(path.read_text()))
+        if checkpoint.kind != kind:
+            raise IngestError(f"{path} is a checkpoint for {checkpoint.kind}")
+        return checkpoint
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(self)))
+        os.replace(tmp, path)
+
+
+@dataclass(slots=True)
+class Rejected:
+    line: int
+    error: str
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise IngestError(f"cannot tell the format of {path}; pass --format")
+
+
+def read_records(
+    f: io.BufferedReader, fmt: str, offset: int = 0, line: int = 0
+) -> Iterator[tuple[int, int, dict | Rejected]]:
+    """``(line, end offset, record)`` from ``offset`` on; ``line`` is where it is.
+
+    The end offset is the byte position just after the record, where reading
+    resumes once everything up to it has been committed.
+    """
+    if fmt == "csv":
+        yield from _read_csv(f, offset, line)
+        return
+    f.seek(offset)
+    for raw in f:
+        offset += len(raw)
+        line += 1
+        if not raw.strip():
+            continue
+        try:
+            record = orjson.loads(raw)
+        except orjson.JSONDecodeError as exc:
+            yield line, offset, Rejected(line, f"invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line, offset, Rejected(line, "not a JSON object")
+            continue
+        yield line, offset, record
+
+
+def _read_csv(
+    f: io.BufferedReader, offset: int, line: int
+) -> Iterator[tuple[int, int, dict | Rejected]]:
+    f.seek(0)
+    header_line = f.readline()
+    header = next(csv.reader([header_line.decode("utf-8-sig")]), None)
+    if not header:
+        return
+    if offset == 0:
+        offset, line = len(header_line), 1
+    f.seek(offset)
+    position = [offset, line]
+
+    def lines() -> Iterator[str]:
+        # the reader pulls exactly the lines of one record before yielding it,
+        # so position is the end of the record just returned
+        for raw in f:
+            position[0] += len(raw)
+            position[1] += 1
+            yield raw.decode("utf-8")
+
+    for values in csv.reader(lines()):
+        offset, line = position
+        if not values:
+            continue
+        if len(values) != len(header):
+            yield line, offset, Rejected(line, f"expected {len(header)} fields")
+            continue
+        # empty cells are missing values, so that schema defaults apply
+        yield line, offset, {k: v for k, v in zip(header, values) if v != ""}
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _known_author_ids(conn: Connection, records: list[PostRecord], cache: dict) -> None:
+    """Resolve the chunk's authors into ``cache`` (username or id -> id)."""
+    names = {r.author for r in records if r.author_id is None} - cache.keys()
+    names.discard(None)
+    if names:
+        rows = conn.execute(
+            select(User.username, User.id).where(User.username.in_(names))
+        )
+        cache.update(dict(rows.all()))
+    ids = {r.author_id for r in records} - cache.keys()
+    ids.discard(None)
+    if ids:
+        cache.update(
+            (i, i) for i in conn.scalars(select(User.id).where(User.id.in_(ids)))
+        )
+
+
+def prepare_posts(
+    conn: Connection,
+    chunk: list[tuple[int, dict]],
+    *,
+    default_author: str | None,
+    summary_length: int | None,
+    authors: dict,
+) -> tuple[list[dict], list[Rejected]]:
+    rows, rejected, valid = [], [], []
+    for line, record in chunk:
+        if default_author and "author_id" not in record and "author" not in record:
+            record["author"] = default_author
+        try:
+            valid.append((line, PostRecord.model_validate(record)))
+        except ValidationError as exc:
+            rejected.append(Rejected(line, _validation_message(exc)))
+    _known_author_ids(conn, [r for _, r in valid], authors)
+    now = datetime.now(timezone.utc)
+    for line, r in valid:
+        key = r.author_id if r.author_id is not None else r.author
+        author_id = authors.get(key) if key is not None else None
+        if author_id is None:
+            rejected.append(Rejected(line, f"unknown author: {key}"))
+            continue
+        created_at = _aware(r.created_at) if r.created_at else now
+        rows.append(
+            {
+                "title": r.title,
+                "content": r.content,
+                "is_public": r.is_public,
+                "author_id": author_id,
+                "summary": (
+                    make_excerpt(r.content, summary_length) or None
+                    if summary_length
+                    else None
+                ),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    return rows, rejected
+
+
+def prepare_users(
+    conn: Connection, chunk: list[tuple[int, dict]]
+) -> tuple[list[dict], list[Rejected]]:
+    rows, rejected = {}, []
+    for line, record in chunk:
+        try:
+            r = UserRecord.model_validate(record)
+            if r.hashed_password:
+                hashed = r.hashed_password
+            elif r.password is not None:
+                UserCreate(username=r.username, password=r.password)
+                hashed = get_password_hash(r.password)
+            else:
+                raise ValueError("password or hashed_password is required")
+        except ValidationError as exc:
+            rejected.append(Rejected(line, _validation_message(exc)))
+            continue
+        except ValueError as exc:
+            rejected.append(Rejected(line, str(exc)))
+            continue
+        if r.username in rows:
+            rejected.append(Rejected(line, f"duplicate username: {r.username}"))
+            continue
+        rows[r.username] = (
+            line,
+            {"username": r.username, "hashed_password": hashed, "is_active": True},
+        )
+    if rows:
+        existing = conn.scalars(select(User.username).where(User.username.in_(rows)))
+        for username in existing:
+            line, _ = rows.pop(username)
+            rejected.append(Rejected(line, f"username already exists: {username}"))
+    return [row for _, row in rows.values()], rejected
+
+
+def _copy_text(value, datetimes: dict) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        # str.replace scans in C; much cheaper than the csv module's quoting
+        return (
+            value.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        # most rows of a chunk share their timestamps
+        text = datetimes.get(value)
+        if text is None:
+            text = datetimes[value] = value.isoformat()
+        return text
+    return str(value)
+
+
+def copy_rows(conn: Connection, table: Table, columns: tuple, rows: list[dict]) -> None:
+    """``COPY table FROM STDIN`` in PostgreSQL's text format."""
+    datetimes: dict = {}
+    buffer = io.StringIO(
+        "".join(
+            "\t".join([_copy_text(row[c], datetimes) for c in columns]) + "\n"
+            for row in rows
+        )
+    )
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def insert_rows(
+    conn: Connection, table: Table, columns: tuple, rows: list[dict]
+) -> None:
+    conn.execute(insert(table), rows)
+
+
+def uses_copy(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+
+
+def max_rss_mib() -> float | None:
+    if resource is None:
+        return None
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024)
+
+
+def ingest(
+    begin: Callable[[], AbstractContextManager[Connection]],
+    path: Path,
+    *,
+    kind: str,
+    fmt: str,
+    chunk_size: int,
+    checkpoint_path: Path | None,
+    rejects_path: Path | None = None,
+    max_errors: int | None = None,
+    default_author: str | None = None,
+    summary_length: int | None = 200,
+    report: Callable[[str], None] = print,
+) -> Checkpoint:
+    """Load ``path`` into the ``kind`` table, one ``begin()`` transaction per chunk.
+
+    Progress continues from ``checkpoint_path`` when it exists and is saved
+    there after each chunk; ``summary_length=None`` leaves summaries to the
+    backfill command. Invalid records are skipped and, with
+    ``rejects_path``, appended there as JSON lines; more than ``max_errors`` of
+    them stops the run before the chunk that crossed the limit is written.
+    """
+    checkpoint = (
+        Checkpoint.load(checkpoint_path, kind) if checkpoint_path else Checkpoint(kind)
+    )
+    table, columns = (
+        (Post.__table__, POST_COLUMNS)
+        if kind == "posts"
+        else (User.__table__, USER_COLUMNS)
+    )
+    authors: dict = {}
+    started = time.perf_counter()
+    start_rows = checkpoint.rows
+
+    def flush(chunk: list[tuple[int, dict]], rejected: list[Rejected], end) -> None:
+        with begin() as conn:
+            if kind == "posts":
+                rows, invalid = prepare_posts(
+                    conn,
+                    chunk,
+                    default_author=default_author,
+                    summary_length=summary_length,
+                    authors=authors,
+                )
+            else:
+                rows, invalid = prepare_users(conn, chunk)
+            rejected.extend(invalid)
+            if (
+                max_errors is not None
+                and checkpoint.rejected + len(rejected) > max_errors
+            ):
+                _write_rejects(rejects_path, rejected)
+                raise IngestError(
+                    f"more than {max_errors} rejected records; stopped at line "
+                    f"{checkpoint.line}"
+                )
+            if rows:
+                write = copy_rows if uses_copy(conn) else insert_rows
+                write(conn, table, columns, rows)
+        _write_rejects(rejects_path, rejected)
+        checkpoint.offset, checkpoint.line = end
+        checkpoint.rows += len(rows)
+        checkpoint.rejected += len(rejected)
+        if checkpoint_path:
+            checkpoint.save(checkpoint_path)
+        elapsed = time.perf_counter() - started
+        rss = max_rss_mib()
+        report(
+            f"{checkpoint.rows} rows, {checkpoint.rejected} rejected, "
+            f"line {checkpoint.line}: "
+            f"{(checkpoint.rows - start_rows) / elapsed:.0f} rows/s"
+            + (f", max RSS {rss:.0f} MiB" if rss is not None else "")
+        )
+
+    with open(path, "rb") as f:
+        chunk: list[tuple[int, dict]] = []
+        rejected: list[Rejected] = []
+        end = (checkpoint.offset, checkpoint.line)
+        for line, offset, record in read_records(
+            f, fmt, checkpoint.offset, checkpoint.line
+        ):
+            end = (offset, line)
+            if isinstance(record, Rejected):
+                rejected.append(record)
+            else:
+                chunk.append((line, record))
+            if len(chunk) >= chunk_size:
+                flush(chunk, rejected, end)
+                chunk, rejected = [], []
+        if chunk or rejected or end != (checkpoint.offset, checkpoint.line):
+            flush(chunk, rejected, end)
+    return checkpoint
+
+
+def _write_rejects(path: Path | None, rejected: list[Rejected]) -> None:
+    if path is None or not rejected:
+        return
+    with open(path, "a") as f:
+        for r in sorted(rejected, key=lambda r: r.line):
+            f.write(json.dumps(asdict(r)) + "\n")
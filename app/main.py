@@ -1,8 +1,37 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
-from app.api.routes import api_router
+from fastapi import FastAPI, Request, Response
+
+from app.api.routes import api_router, posts_async
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
-from app.db.session import init_engine
+from app.core import querydebug
+from app.core.metrics import MetricsMiddleware, render as render_metrics
+from app.db import session as db_session
+from app.db.session import init_async_engine, init_engine, init_read_engines
+from app.workers.fanout import get_fanout_worker
+from app.workers.summary import get_summary_worker
+
+
+async def metrics(request: Request) -> Response:
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    workers = [
+        (get_summary_worker(), settings.SUMMARY_WORKER_ENABLED),
+        (get_fanout_worker(), settings.FEED_FANOUT_ENABLED),
+    ]
+    for worker, enabled in workers:
+        if enabled:
+            worker.start()
+    try:
+        yield
+    finally:
+        for worker, _ in workers:
+            worker.stop()
 
 
 def create_app() -> FastAPI:
@@ -10,10 +39,34 @@ def create_app() -> FastAPI:
         title="KnowledgeHub API",
         description="This app is for practicing",
         version="0.1.0",
+        lifespan=lifespan,
     )
     settings = get_settings()
     init_engine(settings.DATABASE_URL)
+    init_read_engines(settings.DATABASE_READ_URLS)
+    if settings.DATABASE_ASYNC:
+        init_async_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE
+        )
+
+    if settings.QUERY_DEBUG or settings.SLOW_QUERY_MS > 0:
+        for engine in [db_session.engine, *db_session.read_engines]:
+            querydebug.instrument_engine(engine)
+    if settings.QUERY_DEBUG:
+        querydebug.instrument_sessions()
+        app.add_middleware(querydebug.QueryDebugMiddleware)
+
+    if settings.METRICS_ENABLED:
+        # outermost, so latency includes compression and the other middleware
+        app.add_middleware(MetricsMiddleware)
+        app.add_route("/metrics", metrics, include_in_schema=False)
 
+    if settings.DATABASE_ASYNC:
+        # ahead of api_router: these answer the post reads on the asyncio engine
+        app.include_router(posts_async.router, prefix="/api")
     app.include_router(api_router, prefix="/api")
 
     return app
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
+
+from app.db.base_class import Base
+
+
+class Follow(Base):
+    __tablename__ = "follows"
+    follower_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    followee_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# fan-out reads an author's followers; the primary key serves "who do I follow"
+Index("ix_follows_followee_id_follower_id", Follow.followee_id, Follow.follower_id)
+
+
+class TimelineEntry(Base):
+    """One post in one user's precomputed home timeline.
+
+    The key is in feed order (``created_at`` is the post's and never changes,
+    so it is still one entry per user and post): a page is one range scan of
+    it, whatever the number of posts.
+    """
+
+    __tablename__ = "timeline_entries"
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    post_id = Column(
+        Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    # copied from the post, so unfollows are pruned without reading posts
+    author_id = Column(Integer, nullable=False)
+
+
+# post deletes cascade through it
+Index("ix_timeline_entries_post_id", TimelineEntry.post_id)
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import (
     Column,
     Boolean,
@@ -6,7 +8,9 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     text,
+    true,
     DateTime,
+    Index,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -14,6 +18,10 @@ from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Post(Base):
     __tablename__ = "posts"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -23,11 +31,16 @@ class Post(Base):
         Boolean, nullable=False, default=True, server_default=text("true")
     )
     author_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
 
+    # set in Python as well: SQLite's CURRENT_TIMESTAMP has no fractional part,
+    # and keyset cursors compare against values bound with microseconds
     created_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True),
+        default=_utcnow,
+        server_default=func.now(),
+        nullable=False,
     )
 
     updated_at = Column(
@@ -40,3 +53,21 @@ class Post(Base):
     summary = Column(String, nullable=True)
 
     author = relationship("User", back_populates="posts")
+
+
+# shaped for the feed queries in app.crud.post: public posts newest first, and
+# one author's posts newest first (also serves the author_id foreign key)
+Index(
+    "ix_posts_public_created_at_id",
+    Post.created_at.desc(),
+    Post.id.desc(),
+    postgresql_where=Post.is_public,
+    # SQLite only matches partial indexes on the literal term queries use
+    sqlite_where=Post.is_public == true(),
+)
+Index(
+    "ix_posts_author_created_at_id",
+    Post.author_id,
+    Post.created_at.desc(),
+    Post.id.desc(),
+)
@@ -12,5 +12,10 @@ class User(Base):
     is_active = Column(
         Boolean, nullable=False, default=True, server_default=text("true")
     )
+    # maintained by follow / unfollow; authors above FEED_FANOUT_MAX_FOLLOWERS
+    # are merged into feeds at read time instead of fanned out
+    follower_count = Column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
     posts = relationship("Post", back_populates="author", passive_deletes=True)
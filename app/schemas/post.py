@@ -1,8 +1,14 @@
 from datetime import datetime
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 
+TotalMode = Literal["exact", "cached", "estimated", "none"]
+
+MAX_BATCH_ITEMS = 500
+
+
 class PostBase(BaseModel):
     title: str = Field(min_length=1, max_length=100)
     content: str = Field(min_length=1)
@@ -30,11 +36,95 @@ class PostRead(PostBase):
     author_id: int
     created_at: datetime
     updated_at: datetime
+    # plain-text excerpt, filled in the background shortly after a write
+    summary: str | None = None
     model_config = ConfigDict(from_attributes=True)
 
 
-class PostListResponse(BaseModel):
+class AuthorRead(BaseModel):
+    """What ``expand=author`` embeds of a post's author."""
+
+    id: int
+    username: str
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PostReadWithAuthor(PostRead):
+    author: AuthorRead
+
+
+class PostListItem(BaseModel):
+    """A post in a sparse or expanded list response; only what was asked is set."""
+
+    id: int
+    title: str | None = None
+    content: str | None = None
+    is_public: bool | None = None
+    author_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    summary: str | None = None
+    author: AuthorRead | None = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+# selectable with ``fields``; relationships come with ``expand`` instead
+POST_LIST_FIELDS = frozenset(PostListItem.model_fields) - {"author"}
+POST_EXPANSIONS = frozenset({"author"})
+
+
+class PostSearchHit(PostRead):
+    rank: float
+
+
+class PostSearchResponse(BaseModel):
+    items: list[PostSearchHit]
+    limit: int
+    next_cursor: str | None = None
+
+
+class FeedResponse(BaseModel):
     items: list[PostRead]
-    total: int
+    limit: int
+    next_cursor: str | None = None
+
+
+class PostListResponse(BaseModel):
+    items: list[PostRead] | list[PostListItem]
+    total: int | None
+    total_mode: TotalMode = "exact"
     skip: int
     limit: int
+    next_cursor: str | None = None
+
+
+class PostBatchUpdateItem(PostUpdate):
+    id: int
+
+
+# items stay raw so that one bad entry is reported on its own instead of
+# failing the whole request with a 422
+class PostBatchCreate(BaseModel):
+    items: list[dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class PostBatchUpdate(BaseModel):
+    items: list[dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class PostBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class PostBatchItemResult(BaseModel):
+    index: int
+    status: int
+    id: int | None = None
+    item: PostRead | None = None
+    error: Any = None
+
+
+class PostBatchResponse(BaseModel):
+    items: list[PostBatchItemResult]
+    succeeded: int
+    failed: int
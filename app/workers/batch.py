@@ -0,0 +1,97 @@
+import abc
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchWorker(abc.ABC):
+    """Single background thread that processes queued post ids in batches.
+
+    Ids are collected for up to ``flush_interval`` seconds or ``batch_size`` ids,
+    whichever comes first, and handed to :meth:`process` with a fresh session.
+    The queue is bounded: when it is full new ids are dropped and logged.
+    """
+
+    name = "batch-worker"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        batch_size: int,
+        queue_size: int,
+        flush_interval: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+
+    @abc.abstractmethod
+    def process(self, db: Session, post_ids: list[int]) -> None:
+        """Handle one batch of distinct post ids."""
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what is already queued, then stop the thread."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, post_ids: Iterable[int]) -> None:
+        if not self.running:
+            return
+        for post_id in post_ids:
+            try:
+                self._queue.put_nowait(post_id)
+            except queue.Full:
+                logger.warning("%s queue full, dropping post %s", self.name, post_id)
+
+    def _next_batch(self) -> tuple[list[int], bool]:
+        batch: list[int] = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while item is not _STOP:
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                continue
+            # the same post is often queued by create and a quick follow-up edit
+            post_ids = list(dict.fromkeys(batch))
+            try:
+                with self.session_factory() as db:
+                    self.process(db, post_ids)
+            except Exception:
+                logger.exception("%s failed on posts %s", self.name, post_ids)
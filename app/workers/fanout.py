@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.crud.feed import fan_out_posts
+from app.db import session as db_session
+from app.workers.batch import BatchWorker
+
+
+class FanoutWorker(BatchWorker):
+    """Delivers queued public posts to followers' timelines, one statement per batch.
+
+    Posts dropped because the queue was full stay out of timelines; followers
+    still see them on their author's own post list.
+    """
+
+    name = "fanout-worker"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        max_followers: int,
+        batch_size: int,
+        queue_size: int,
+        flush_interval: float = 0.5,
+    ):
+        super().__init__(
+            session_factory,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            flush_interval=flush_interval,
+        )
+        self.max_followers = max_followers
+
+    def process(self, db: Session, post_ids: list[int]) -> None:
+        fan_out_posts(db, post_ids, self.max_followers)
+
+
+@lru_cache()
+def get_fanout_worker() -> FanoutWorker:
+    settings = get_settings()
+    return FanoutWorker(
+        # resolved per batch: the engine is created in create_app
+        lambda: db_session.SessionLocal(),
+        max_followers=settings.FEED_FANOUT_MAX_FOLLOWERS,
+        batch_size=settings.FEED_FANOUT_BATCH_SIZE,
+        queue_size=settings.FEED_FANOUT_QUEUE_SIZE,
+    )
+
+
+def enqueue_fanout(post_ids: Iterable[int]) -> None:
+    """Queue posts that are now public; a no-op when the worker isn't running."""
+    get_fanout_worker().enqueue(post_ids)
@@ -0,0 +1,99 @@
+import html
+import re
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.crud.post import get_post_contents, write_summaries
+from app.db import session as db_session
+from app.workers.batch import BatchWorker
+
+_TAG = re.compile(r"<[^>]*>")
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+# block markers only count at the start of a line: "C#" and "a > b" are text
+_BLOCK = re.compile(r"^[ \t]*(?:#{1,6}(?=\s)|(?:>[ \t]?)+|```.*$)", re.MULTILINE)
+# table separator rows ("|---|:--:|") and horizontal rules
+_RULE = re.compile(r"^[ \t]*\|?[ \t]*:?-{3,}[-:| \t]*$", re.MULTILINE)
+_TABLE_ROW = re.compile(r"^[ \t]*\|(.*?)\|?[ \t]*$", re.MULTILINE)
+# paired delimiters; "_" must sit outside words so snake_case survives
+_EMPHASIS = re.compile(
+    r"(\*\*|~~|\*|`+)(?=\S)(.+?)(?<=\S)\1|(?<!\w)(__?)(?=\S)(.+?)(?<=\S)\3(?!\w)"
+)
+_SPACE = re.compile(r"\s+")
+
+
+def make_excerpt(content: str, length: int) -> str:
+    """Plain-text excerpt of at most ``length`` characters, cut at a word boundary."""
+    text = html.unescape(_TAG.sub(" ", content))
+    text = _LINK.sub(r"\1", text)
+    text = _TABLE_ROW.sub(lambda m: m.group(1).replace("|", " "), _RULE.sub("", text))
+    text = _BLOCK.sub("", text)
+    # inline markers hug their words: "**friends**," must stay "friends,"
+    text = _EMPHASIS.sub(lambda m: m.group(2) or m.group(4), text)
+    text = _SPACE.sub(" ", text).strip()
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1]
+    head, _, _ = cut.rpartition(" ")
+    # only back up to a space when it doesn't throw away most of the excerpt
+    if len(head) >= length // 2:
+        cut = head
+    return cut.rstrip(" .,;:") + "…"
+
+
+def summarize_posts(db: Session, post_ids: Iterable[int], length: int) -> int:
+    """Compute and store excerpts for ``post_ids`` in one bulk update."""
+    contents = get_post_contents(db, post_ids)
+    write_summaries(
+        db, {post_id: make_excerpt(c, length) for post_id, c in contents.items()}
+    )
+    return len(contents)
+
+
+class SummaryWorker(BatchWorker):
+    """Turns queued post ids into summaries, written with one statement per batch.
+
+    Ids dropped because the queue was full are picked up later by the backfill
+    command (``python -m app.cli backfill-summaries``).
+    """
+
+    name = "summary-worker"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        length: int,
+        batch_size: int,
+        queue_size: int,
+        flush_interval: float = 0.5,
+    ):
+        super().__init__(
+            session_factory,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            flush_interval=flush_interval,
+        )
+        self.length = length
+
+    def process(self, db: Session, post_ids: list[int]) -> None:
+        summarize_posts(db, post_ids, self.length)
+
+
+@lru_cache()
+def get_summary_worker() -> SummaryWorker:
+    settings = get_settings()
+    return SummaryWorker(
+        # resolved per batch: the engine is created in create_app
+        lambda: db_session.SessionLocal(),
+        length=settings.SUMMARY_LENGTH,
+        batch_size=settings.SUMMARY_BATCH_SIZE,
+        queue_size=settings.SUMMARY_QUEUE_SIZE,
+    )
+
+
+def enqueue_summaries(post_ids: Iterable[int]) -> None:
+    """Queue posts whose content changed; a no-op when the worker isn't running."""
+    get_summary_worker().enqueue(post_ids)
@@ -0,0 +1,5 @@
+"""Load and latency benchmarks for the API.
+
+Seed a dedicated database, run scenarios against it and compare the results
+with a stored baseline; see ``python -m benchmarks --help``.
+"""
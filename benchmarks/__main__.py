@@ -0,0 +1,210 @@
+"""``python -m benchmarks seed|run|compare``; see ``--help`` of each command."""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import httpx  # noqa: F401
+except ImportError:
+    sys.exit("the benchmarks need httpx: pip install -r requirements-dev.txt")
+
+from benchmarks import datagen
+from benchmarks.driver import make_client, run_scenario
+from benchmarks.report import compare, format_table, summarize, summarize_kinds
+from benchmarks.scenarios import SCENARIOS, Context
+
+DEFAULT_SCENARIOS = "anonymous_feed,authenticated_feed,post_detail,write_mix"
+# settings that change what is being measured, recorded with every result
+RECORDED_ENV = (
+    "POST_LIST_FAST_JSON",
+    "POST_PAGE_CACHE_PAGES",
+    "COMPRESSION_ENABLED",
+    "JWT_CACHE_ENABLED",
+    "PASSWORD_HASH_WORKERS",
+    "DB_POOL_SIZE",
+    "DB_POOL_PRE_PING",
+    "DATABASE_READ_URLS",
+    "DATABASE_ASYNC",
+    "RATE_LIMIT_ENABLED",
+)
+
+
+def _size_range(value: str) -> tuple[int, int]:
+    low, _, high = value.partition(":")
+    return int(low), int(high or low)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_seed(args: argparse.Namespace) -> int:
+    manifest = datagen.seed(
+        args.database_url,
+        users=args.users,
+        posts=args.posts,
+        seed=args.seed,
+        public_ratio=args.public_ratio,
+        content_size=args.content_size,
+    )
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    headers = {"Accept-Encoding": args.accept_encoding}
+    ctx = Context(users=args.users, page_size=args.page_size)
+    for param in args.feed_param:
+        key, _, value = param.partition("=")
+        ctx.feed_params[key] = value
+    results = {}
+    async with make_client(
+        base_url=args.base_url, concurrency=args.concurrency, headers=headers
+    ) as client:
+        for name in args.scenarios.split(","):
+            samples, elapsed = await run_scenario(
+                client,
+                SCENARIOS[name](),
+                ctx,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                warmup=args.warmup,
+                seed=args.seed,
+            )
+            results[name] = summarize(samples, elapsed)
+            print(f"{name}: {results[name]['rps']:.1f} req/s", file=sys.stderr)
+            # e.g. login_mix.read: compared and tabled like any other scenario
+            for kind, summary in summarize_kinds(samples, elapsed).items():
+                results[f"{name}.{kind}"] = summary
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "target": args.base_url or "in-process",
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "page_size": args.page_size,
+            "feed_params": ctx.feed_params,
+            "accept_encoding": args.accept_encoding,
+            "env": {
+                name: os.environ[name] for name in RECORDED_ENV if name in os.environ
+            },
+        },
+        "scenarios": results,
+    }
+
+
+def _check_baseline(results: dict, baseline_path: Path, tolerance: float) -> int:
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(results, baseline, tolerance)
+    if not regressions:
+        print(f"no regressions beyond {tolerance:.0%} against {baseline_path}")
+        return 0
+    print(f"regressions beyond {tolerance:.0%} against {baseline_path}:")
+    for line in regressions:
+        print(f"  {line}")
+    return 1
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        print(f"unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    results = asyncio.run(_run(args))
+    print(format_table(results))
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"results written to {args.out}")
+    if args.baseline:
+        return _check_baseline(results, args.baseline, args.tolerance)
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    results = json.loads(args.results.read_text())
+    print(format_table(results))
+    return _check_baseline(results, args.baseline, args.tolerance)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="fill a dedicated database with test data")
+    seed.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="defaults to DATABASE_URL; all users and posts in it are replaced",
+    )
+    seed.add_argument("--users", type=int, default=100)
+    seed.add_argument("--posts", type=int, default=20000)
+    seed.add_argument("--seed", type=int, default=42)
+    seed.add_argument("--public-ratio", type=float, default=0.8)
+    seed.add_argument(
+        "--content-size",
+        type=_size_range,
+        default=(200, 2000),
+        help="MIN:MAX characters, e.g. 10000:50000 for large posts",
+    )
+    seed.set_defaults(handler=cmd_seed)
+
+    run = commands.add_parser("run", help="drive scenarios and report latency")
+    run.add_argument(
+        "--base-url",
+        default=None,
+        help="server to load, e.g. http://127.0.0.1:8000; in-process app if omitted",
+    )
+    run.add_argument("--scenarios", default=DEFAULT_SCENARIOS)
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--duration", type=float, default=15.0)
+    run.add_argument("--warmup", type=float, default=3.0)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--users", type=int, default=100, help="as passed to seed")
+    run.add_argument("--page-size", type=int, default=20)
+    run.add_argument(
+        "--feed-param",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra feed query parameter, e.g. total_mode=estimated",
+    )
+    run.add_argument("--accept-encoding", default="identity")
+    run.add_argument("--out", type=Path, help="write results as JSON")
+    run.add_argument("--baseline", type=Path, help="results JSON to compare with")
+    run.add_argument("--tolerance", type=float, default=0.15)
+    run.set_defaults(handler=cmd_run)
+
+    cmp = commands.add_parser("compare", help="compare saved results to a baseline")
+    cmp.add_argument("results", type=Path)
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("--tolerance", type=float, default=0.15)
+    cmp.set_defaults(handler=cmd_compare)
+
+    args = parser.parse_args(argv)
+    if args.command == "seed" and not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Seeded, reproducible users and posts for benchmark databases."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Engine, create_engine, delete, insert, make_url, select, text
+
+from app.core.security import pwd_context
+from app.db.base import Base
+from app.models.post import Post
+from app.models.user import User
+
+PASSWORD = "bench-password"
+USERNAME_PREFIX = "bench"
+# fixed so that two seeds of the same size produce identical tables
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    "postgres index query plan cache latency throughput replica shard queue "
+    "worker batch stream cursor keyset offset vacuum analyze partition schema "
+    "migration commit rollback lock deadlock isolation snapshot buffer page "
+    "tuple heap toast json vector search rank token session pool connection "
+    "timeout retry backoff budget metric histogram gauge counter alert deploy "
+    "release feature flag canary rollout python fastapi sqlalchemy pydantic "
+    "async thread process memory profile benchmark regression baseline"
+).split()
+
+
+def username(index: int) -> str:
+    return f"{USERNAME_PREFIX}{index:05d}"
+
+
+def make_text(rng: random.Random, size: int) -> str:
+    words: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def generate_posts(
+    rng: random.Random,
+    *,
+    posts: int,
+    author_ids: list[int],
+    public_ratio: float,
+    content_size: tuple[int, int],
+) -> Iterator[dict]:
+    """Rows for ``posts`` posts, newest first, one second apart."""
+    for index in range(posts):
+        yield {
+            "title": make_text(rng, rng.randint(10, 80)),
+            "content": make_text(rng, rng.randint(*content_size)),
+            "is_public": rng.random() < public_ratio,
+            "author_id": rng.choice(author_ids),
+            "created_at": EPOCH - timedelta(seconds=index),
+            "updated_at": EPOCH - timedelta(seconds=index),
+        }
+
+
+def prepare_schema(engine: Engine) -> None:
+    url = engine.url
+    if url.get_backend_name() == "sqlite":
+        # the migrations use PostgreSQL's now(); SQLite gets the model schema
+        # (no search table, so the search scenario needs PostgreSQL)
+        Base.metadata.create_all(engine)
+        return
+    config = Config("alembic.ini")
+    # configparser treats % as interpolation; escape the URL-encoded parts
+    rendered = url.render_as_string(hide_password=False).replace("%", "%%")
+    config.set_main_option("sqlalchemy.url", rendered)
+    command.upgrade(config, "head")
+
+
+def seed(
+    database_url: str,
+    *,
+    users: int,
+    posts: int,
+    seed: int = 42,
+    public_ratio: float = 0.8,
+    content_size: tuple[int, int] = (200, 2000),
+    batch_size: int = 1000,
+) -> dict:
+    """Replace every user and post in ``database_url`` with generated data.
+
+    Meant for a dedicated benchmark database: existing rows are deleted.
+    """
+    rng = random.Random(seed)
+    engine = create_engine(database_url)
+    try:
+        prepare_schema(engine)
+        # one hash for everyone: seeding shouldn't spend minutes in bcrypt
+        hashed = pwd_context.hash(PASSWORD)
+        with engine.begin() as conn:
+            conn.execute(delete(Post))
+            conn.execute(delete(User))
+            conn.execute(
+                insert(User),
+                [
+                    {"username": username(i), "hashed_password": hashed}
+                    for i in range(users)
+                ],
+            )
+            author_ids = list(conn.scalars(select(User.id).order_by(User.id)))
+            batch = []
+            for row in generate_posts(
+                rng,
+                posts=posts,
+                author_ids=author_ids,
+                public_ratio=public_ratio,
+                content_size=content_size,
+            ):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    conn.execute(insert(Post), batch)
+                    batch.clear()
+            if batch:
+                conn.execute(insert(Post), batch)
+        # fresh planner statistics, also used by total_mode=estimated
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+    finally:
+        engine.dispose()
+    return {
+        "database": make_url(database_url).get_backend_name(),
+        "seed": seed,
+        "users": users,
+        "posts": posts,
+        "public_ratio": public_ratio,
+        "content_size": list(content_size),
+    }
@@ -0,0 +1,92 @@
+"""Closed-loop asyncio load driver.
+
+Each of ``concurrency`` workers sends one request, waits for the response and
+immediately sends the next, so throughput is whatever the server sustains at
+that many requests in flight. Samples from the warmup period are discarded.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+from benchmarks.report import Sample
+from benchmarks.scenarios import Context, Scenario
+
+
+def make_client(
+    *,
+    base_url: str | None,
+    concurrency: int,
+    headers: dict[str, str] | None = None,
+) -> httpx.AsyncClient:
+    """HTTP client for a running server, or in-process ASGI without ``base_url``.
+
+    The in-process app is imported lazily so that it picks up ``DATABASE_URL``
+    and the other settings from the environment of the benchmark run. Its rate
+    limits are off unless ``RATE_LIMIT_ENABLED`` says otherwise: every request
+    comes from one client, so the login and write scenarios would only measure
+    429s. Start a server under test with ``RATE_LIMIT_ENABLED=false`` likewise.
+    """
+    if base_url is None:
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+    else:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=concurrency)
+        )
+    return httpx.AsyncClient(
+        transport=transport, base_url=base_url, headers=headers, timeout=30
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: Context,
+    *,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+) -> tuple[list[Sample], float]:
+    """Drive ``scenario`` for ``warmup + duration`` seconds; samples and elapsed."""
+    await scenario.setup(client, ctx)
+    samples: list[Sample] = []
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(f"{seed}:{scenario.name}:{worker_id}")
+        role = scenario.for_worker(worker_id, concurrency)
+        while (now := loop.time()) < stop_at:
+            request = role.next_request(rng, ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method,
+                    request.url,
+                    params=request.params,
+                    headers=request.headers,
+                    json=request.json,
+                    data=request.data,
+                )
+            except httpx.HTTPError:
+                status, size, response = 0, 0, None
+            else:
+                status, size = response.status_code, response.num_bytes_downloaded
+            latency = time.perf_counter() - started
+            if now >= measure_from:
+                samples.append(Sample(latency, status, size, request.kind))
+            if response is not None:
+                role.record(request, response, ctx)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    # requests started before stop_at may finish a little after it
+    return samples, loop.time() - measure_from
@@ -0,0 +1,91 @@
+"""Latency percentiles, result summaries and baseline comparison."""
+
+import math
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Sample:
+    latency: float
+    status: int
+    size: int
+    kind: str | None = None
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    latencies = sorted(s.latency for s in samples)
+    errors = sum(1 for s in samples if s.status >= 400 or s.status == 0)
+    count = len(samples)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": errors / count if count else 0.0,
+        "rps": count / elapsed if elapsed else 0.0,
+        "mean_ms": 1000 * sum(latencies) / count if count else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+        # bytes as received, i.e. after any Content-Encoding
+        "bytes_per_request": sum(s.size for s in samples) / count if count else 0.0,
+    }
+
+
+def summarize_kinds(samples: list[Sample], elapsed: float) -> dict[str, dict]:
+    """:func:`summarize` per request kind of a mixed scenario."""
+    kinds: dict[str, list[Sample]] = {}
+    for sample in samples:
+        if sample.kind is not None:
+            kinds.setdefault(sample.kind, []).append(sample)
+    return {kind: summarize(subset, elapsed) for kind, subset in sorted(kinds.items())}
+
+
+# metric -> True when a higher value is better
+COMPARED = {"rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions beyond ``tolerance`` (a fraction) in scenarios both runs have."""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = base[metric], result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(
+                    f"{name}: {metric} {old:.2f} -> {new:.2f} ({change:+.1%})"
+                )
+        if result["error_rate"] > base["error_rate"] + tolerance:
+            regressions.append(
+                f"{name}: error_rate {base['error_rate']:.2%} -> "
+                f"{result['error_rate']:.2%}"
+            )
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    header = (
+        f"{'scenario':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'bytes/req':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, r in results["scenarios"].items():
+        lines.append(
+            f"{name:<20} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['errors']:>7} {r['bytes_per_request']:>10.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,274 @@
+"""Traffic shapes to replay against a seeded database.
+
+A scenario prepares shared state once (tokens, known post ids) and then hands
+every driver worker one request at a time.
+"""
+
+import abc
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from benchmarks.datagen import PASSWORD, WORDS, username
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    params: dict[str, Any] | None = None
+    headers: dict[str, str] | None = None
+    json: Any = None
+    data: dict[str, str] | None = None
+    # index of the seeded user the request acts as, if any
+    user: int | None = None
+    # label for mixed scenarios; each kind is also reported on its own
+    kind: str | None = None
+
+
+@dataclass
+class Context:
+    """What the seeded database looks like, plus state gathered in setup."""
+
+    users: int
+    page_size: int = 20
+    # extra query parameters for feed requests, e.g. fields / total_mode
+    feed_params: dict[str, str] = field(default_factory=dict)
+    tokens: list[tuple[int, str]] = field(default_factory=list)
+    post_ids: list[int] = field(default_factory=list)
+    own_posts: dict[int, list[int]] = field(default_factory=dict)
+
+
+async def login(client: httpx.AsyncClient, index: int) -> str:
+    r = await client.post(
+        "/api/auth/token", data={"username": username(index), "password": PASSWORD}
+    )
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+
+def bearer(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+class Scenario(abc.ABC):
+    name = ""
+    description = ""
+
+    async def setup(self, client: httpx.AsyncClient, ctx: Context) -> None:
+        pass
+
+    @abc.abstractmethod
+    def next_request(self, rng: random.Random, ctx: Context) -> Request:
+        """The next request a worker sends."""
+
+    def record(self, request: Request, response: httpx.Response, ctx: Context):
+        """Hook to learn from responses (ids of created posts and so on)."""
+
+    def for_worker(self, worker_id: int, concurrency: int) -> "Scenario":
+        """What driver worker ``worker_id`` sends; mixed scenarios split roles."""
+        return self
+
+
+async def _login_some(client: httpx.AsyncClient, ctx: Context, count: int = 20):
+    if ctx.tokens:
+        return
+    for index in range(min(count, ctx.users)):
+        ctx.tokens.append((index, await login(client, index)))
+
+
+async def _collect_post_ids(client: httpx.AsyncClient, ctx: Context, pages: int = 10):
+    if ctx.post_ids:
+        return
+    cursor = None
+    for _ in range(pages):
+        params = {"limit": 100, "fields": "id", "total_mode": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/api/posts", params=params)
+        r.raise_for_status()
+        data = r.json()
+        ctx.post_ids.extend(item["id"] for item in data["items"])
+        cursor = data.get("next_cursor")
+        if not cursor:
+            break
+
+
+class AnonymousFeed(Scenario):
+    name = "anonymous_feed"
+    description = "anonymous GET /api/posts, mostly the first page"
+
+    def next_request(self, rng, ctx):
+        params = {"limit": ctx.page_size, **ctx.feed_params}
+        if rng.random() < 0.2:
+            params["skip"] = ctx.page_size * rng.randint(1, 10)
+        return Request("GET", "/api/posts", params=params)
+
+
+class AuthenticatedFeed(Scenario):
+    name = "authenticated_feed"
+    description = "signed-in GET /api/posts with mine / is_public filters"
+
+    async def setup(self, client, ctx):
+        await _login_some(client, ctx)
+
+    def next_request(self, rng, ctx):
+        _, token = rng.choice(ctx.tokens)
+        params = {"limit": ctx.page_size, **ctx.feed_params}
+        if rng.random() < 0.5:
+            params["mine"] = "true"
+        choice = rng.choice((None, "true", "false"))
+        if choice is not None:
+            params["is_public"] = choice
+        return Request("GET", "/api/posts", params=params, headers=bearer(token))
+
+
+class AuthMe(Scenario):
+    name = "auth_me"
+    description = "GET /api/users/me: the bearer-token dependency and nothing else"
+
+    async def setup(self, client, ctx):
+        await _login_some(client, ctx)
+
+    def next_request(self, rng, ctx):
+        _, token = rng.choice(ctx.tokens)
+        return Request("GET", "/api/users/me", headers=bearer(token))
+
+
+class SparseFeed(AnonymousFeed):
+    name = "sparse_feed"
+    description = "anonymous feed asking only for list fields (no content)"
+
+    def next_request(self, rng, ctx):
+        request = super().next_request(rng, ctx)
+        request.params["fields"] = "id,title,created_at,author_id,summary"
+        return request
+
+
+class PostDetail(Scenario):
+    name = "post_detail"
+    description = "anonymous GET /api/posts/{id} over known public posts"
+
+    async def setup(self, client, ctx):
+        await _collect_post_ids(client, ctx)
+
+    def next_request(self, rng, ctx):
+        return Request("GET", f"/api/posts/{rng.choice(ctx.post_ids)}")
+
+
+class Search(Scenario):
+    name = "search"
+    description = "GET /api/posts/search with one or two seed words (PostgreSQL)"
+
+    def next_request(self, rng, ctx):
+        q = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+        return Request("GET", "/api/posts/search", params={"q": q, "limit": 20})
+
+
+class LoginStorm(Scenario):
+    name = "login_storm"
+    description = "POST /api/auth/token for random users (bcrypt bound)"
+
+    def next_request(self, rng, ctx):
+        data = {"username": username(rng.randrange(ctx.users)), "password": PASSWORD}
+        return Request("POST", "/api/auth/token", data=data)
+
+
+class Labeled(Scenario):
+    """Another scenario's requests, tagged with ``kind``."""
+
+    def __init__(self, inner: Scenario, kind: str):
+        self.inner = inner
+        self.kind = kind
+
+    def next_request(self, rng, ctx):
+        request = self.inner.next_request(rng, ctx)
+        request.kind = self.kind
+        return request
+
+    def record(self, request, response, ctx):
+        self.inner.record(request, response, ctx)
+
+
+class LoginMix(Scenario):
+    name = "login_mix"
+    description = "post detail reads while other workers keep bcrypt busy with logins"
+    # share of the workers that only log in; the rest only read
+    login_share = 0.25
+
+    def __init__(self):
+        self.logins = Labeled(LoginStorm(), "login")
+        self.reads = Labeled(PostDetail(), "read")
+
+    async def setup(self, client, ctx):
+        await _collect_post_ids(client, ctx)
+
+    def next_request(self, rng, ctx):
+        # a lone worker has to take both roles
+        if rng.random() < self.login_share:
+            return self.logins.next_request(rng, ctx)
+        return self.reads.next_request(rng, ctx)
+
+    def for_worker(self, worker_id, concurrency):
+        # fixed roles: in one random mix, slow logins would end up holding
+        # every worker and leave hardly any reads in flight
+        if concurrency < 2:
+            return self
+        logins = min(max(round(concurrency * self.login_share), 1), concurrency - 1)
+        return self.logins if worker_id < logins else self.reads
+
+
+class WriteMix(Scenario):
+    name = "write_mix"
+    description = "70% signed-in feed reads, 20% creates, 10% edits of own posts"
+
+    async def setup(self, client, ctx):
+        await _login_some(client, ctx)
+
+    def next_request(self, rng, ctx):
+        user_index, token = rng.choice(ctx.tokens)
+        roll = rng.random()
+        if roll < 0.7:
+            return Request(
+                "GET",
+                "/api/posts",
+                params={"limit": ctx.page_size, **ctx.feed_params},
+                headers=bearer(token),
+            )
+        own = ctx.own_posts.get(user_index)
+        if roll < 0.9 or not own:
+            body = {
+                "title": " ".join(rng.sample(WORDS, 4)),
+                "content": " ".join(rng.choices(WORDS, k=200)),
+                "is_public": rng.random() < 0.8,
+            }
+            return Request(
+                "POST", "/api/posts", json=body, headers=bearer(token), user=user_index
+            )
+        body = {"content": " ".join(rng.choices(WORDS, k=200))}
+        return Request(
+            "PATCH", f"/api/posts/{rng.choice(own)}", json=body, headers=bearer(token)
+        )
+
+    def record(self, request, response, ctx):
+        # remember created posts so later edits hit posts the user owns
+        if request.method == "POST" and response.status_code == 201:
+            ctx.own_posts.setdefault(request.user, []).append(response.json()["id"])
+
+
+SCENARIOS: dict[str, type[Scenario]] = {
+    cls.name: cls
+    for cls in (
+        AnonymousFeed,
+        AuthenticatedFeed,
+        AuthMe,
+        SparseFeed,
+        PostDetail,
+        Search,
+        LoginStorm,
+        LoginMix,
+        WriteMix,
+    )
+}
@@ -1,14 +1,19 @@
 # tests/conftest.py
 import os
+from contextlib import contextmanager
 
 import pytest
 from alembic import command
 from alembic.config import Config
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_recent_writers
+from app.core.ratelimit import get_rate_limiter
+from app.core.security import get_token_cache
+from app.crud.post import get_count_cache, get_page_cache, get_post_cache
+from app.crud.user import get_user_cache
 from app.main import app
 
 
@@ -41,6 +46,19 @@ def apply_migrations(test_database_url: str):
     yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # in-process caches outlive the per-test transaction rollback
+    get_token_cache().clear()
+    get_count_cache().clear()
+    get_post_cache().clear()
+    get_page_cache().clear()
+    get_user_cache().clear()
+    get_recent_writers().clear()
+    get_rate_limiter().clear()
+    yield
+
+
 @pytest.fixture()
 def db_session(engine, SessionLocal) -> Session:
     connection = engine.connect()
@@ -67,3 +85,31 @@ def client(db_session: Session) -> TestClient:
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def assert_queries(engine):
+    """``with assert_queries(n):`` fails unless exactly n statements ran inside.
+
+    Counts every statement on the test engine, i.e. everything the requests
+    made through ``client`` run. The statements are listed on failure.
+    """
+
+    @contextmanager
+    def check(expected: int):
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(" ".join(statement.split()))
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert len(statements) == expected, (
+            f"expected {expected} statements, ran {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return check
@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.deps import get_async_db, get_db
+from app.core.cache import AsyncSingleFlight
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.crud.user import get_user_cache
+from app.db import session as db_session
+from app.db.session import to_async_url
+from app.main import create_app
+from app.models.post import Post
+from app.models.user import User
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert (
+        to_async_url("postgresql+psycopg2://u:p@localhost/kh")
+        == "postgresql+asyncpg://u:p@localhost/kh"
+    )
+
+
+def test_async_read_routes(test_database_url, monkeypatch):
+    monkeypatch.setattr(get_settings(), "DATABASE_ASYNC", True)
+    monkeypatch.setattr(get_settings(), "ASYNC_DATABASE_URL", None)
+    monkeypatch.setattr(get_settings(), "POST_LIST_FAST_JSON", False)
+    for name in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal"):
+        monkeypatch.setattr(db_session, name, getattr(db_session, name))
+    app = create_app()
+
+    def sync_db():
+        raise AssertionError("the read routes should not use the sync engine")
+
+    async def scenario():
+        engine = create_async_engine(to_async_url(test_database_url))
+        try:
+            async with engine.connect() as conn:
+                trans = await conn.begin()
+                db = AsyncSession(
+                    bind=conn,
+                    expire_on_commit=False,
+                    join_transaction_mode="create_savepoint",
+                )
+
+                async def async_db():
+                    yield db
+
+                app.dependency_overrides[get_async_db] = async_db
+                app.dependency_overrides[get_db] = sync_db
+                try:
+                    user = User(username="async_bob", hashed_password="x")
+                    db.add(user)
+                    await db.flush()
+                    pub = Post(title="pub", content="c", author_id=user.id)
+                    priv = Post(
+                        title="priv", content="c", is_public=False, author_id=user.id
+                    )
+                    db.add_all([pub, priv])
+                    await db.flush()
+                    headers = {
+                        "Authorization": f"Bearer {create_access_token(str(user.id))}"
+                    }
+                    transport = httpx.ASGITransport(app=app)
+                    async with httpx.AsyncClient(
+                        transport=transport, base_url="http://test"
+                    ) as client:
+                        r = await client.get("/api/posts")
+                        assert r.status_code == 200, r.text
+                        assert [p["title"] for p in r.json()["items"]] == ["pub"]
+                        etag = r.headers["ETag"]
+                        r = await client.get(
+                            "/api/posts", headers={"If-None-Match": etag}
+                        )
+                        assert r.status_code == 304
+
+                        r = await client.get(
+                            "/api/posts", params={"mine": True}, headers=headers
+                        )
+                        assert r.json()["total"] == 2
+                        assert get_user_cache().get(user.id) is not None
+                        r = await client.get(
+                            "/api/posts",
+                            params={
+                                "mine": True,
+                                "fields": "title",
+                                "expand": "author",
+                            },
+                            headers=headers,
+                        )
+                        assert r.json()["items"][1] == {
+                            "id": pub.id,
+                            "title": "pub",
+                            "author": {"id": user.id, "username": "async_bob"},
+                        }
+                        get_settings().POST_LIST_FAST_JSON = True
+                        r = await client.get(
+                            "/api/posts", params={"mine": True}, headers=headers
+                        )
+                        assert [p["title"] for p in r.json()["items"]] == [
+                            "priv",
+                            "pub",
+                        ]
+
+                        r = await client.get(f"/api/posts/{pub.id}?expand=author")
+                        assert r.json()["author"]["username"] == "async_bob"
+                        r = await client.get(f"/api/posts/{priv.id}")
+                        assert r.status_code == 401
+                        r = await client.get(f"/api/posts/{priv.id}", headers=headers)
+                        assert r.status_code == 200
+
+                        # the other GET routes under /posts stay on the sync router
+                        r = await client.get("/api/posts/health")
+                        assert r.json() == {"status": "ok"}
+                finally:
+                    app.dependency_overrides.clear()
+                    await db.close()
+                    await trans.rollback()
+        finally:
+            await engine.dispose()
+            await db_session.async_engine.dispose()
+            db_session.engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_async_single_flight_shares_one_call():
+    calls = []
+
+    async def scenario():
+        flights = AsyncSingleFlight()
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+        assert results == [1] * 5
+        assert await flights.do("k", work) == 2
+
+    asyncio.run(scenario())
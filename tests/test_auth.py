@@ -1,3 +1,7 @@
+import threading
+
+from app.core import security
+from app.core.config import get_settings
 from tests.helpers import create_user, login_and_get_token
 
 
@@ -24,3 +28,46 @@ def test_token_wrong_password_401(client, db_session):
         headers={"Content-Type": "application/x-www-form-urlencoded"},
     )
     assert r.status_code == 401
+
+
+def test_token_503_when_hashing_pool_saturated(client, db_session, monkeypatch):
+    create_user(db_session, username="carol", password="12345678")
+    executor, _ = security._hashing_pool()
+    monkeypatch.setattr(
+        security, "_hashing_pool", lambda: (executor, threading.BoundedSemaphore(0))
+    )
+
+    r = client.post(
+        "/api/auth/token",
+        data={"username": "carol", "password": "12345678"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert r.status_code == 503, r.text
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_authenticated_user_served_from_cache(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "OPS_ENDPOINTS_ENABLED", True)
+    create_user(db_session, username="dave", password="12345678")
+    token = login_and_get_token(client, "dave", "12345678")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for _ in range(3):
+        r = client.get("/api/users/me", headers=headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["username"] == "dave"
+
+    stats = client.get("/api/ops/caches").json()["users"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_decode_access_token_caches_verified_tokens():
+    token = security.create_access_token(subject="42")
+
+    assert security.decode_access_token(token) == "42"
+    assert security.decode_access_token(token) == "42"
+    assert security.get_token_cache().stats()["hits"] == 1
+
+    # a tampered token hashes to a different key and still fails verification
+    assert security.decode_access_token(token[:-2] + "xx") is None
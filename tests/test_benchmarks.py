@@ -0,0 +1,124 @@
+import asyncio
+import random
+
+import httpx
+
+from app.main import app
+from app.core.config import get_settings
+from benchmarks.datagen import PASSWORD, generate_posts, username
+from benchmarks.driver import run_scenario
+from benchmarks.report import (
+    Sample,
+    compare,
+    percentile,
+    summarize,
+    summarize_kinds,
+)
+from benchmarks.scenarios import AnonymousFeed, Context, LoginMix
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7
+    assert percentile([], 50) == 0
+
+
+def test_summarize_and_compare_flag_regressions():
+    samples = [Sample(0.010, 200, 100)] * 9 + [Sample(0.100, 500, 50)]
+    summary = summarize(samples, elapsed=2.0)
+    assert summary["requests"] == 10
+    assert summary["errors"] == 1
+    assert summary["rps"] == 5
+    assert summary["p50_ms"] == 10
+    assert summary["p99_ms"] == 100
+
+    baseline = {"scenarios": {"feed": summary}}
+    assert compare({"scenarios": {"feed": summary}}, baseline, 0.1) == []
+
+    slower = {**summary, "rps": 4.0, "p95_ms": summary["p95_ms"] * 1.5}
+    regressions = compare({"scenarios": {"feed": slower}}, baseline, 0.1)
+    assert [r.split(" ")[1] for r in regressions] == ["rps", "p95_ms"]
+
+
+def test_generate_posts_is_reproducible():
+    def rows(seed):
+        return list(
+            generate_posts(
+                random.Random(seed),
+                posts=50,
+                author_ids=[1, 2, 3],
+                public_ratio=0.5,
+                content_size=(100, 200),
+            )
+        )
+
+    assert rows(7) == rows(7)
+    assert rows(7) != rows(8)
+    assert all(100 <= len(row["content"]) <= 200 for row in rows(7))
+
+
+# one worker: every request goes through the test's single db_session, which
+# must not be used from two threadpool threads at once
+def test_driver_runs_scenario_in_process(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "t1", "c", True)
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await run_scenario(
+                c,
+                AnonymousFeed(),
+                Context(users=1),
+                concurrency=1,
+                duration=0.2,
+                warmup=0.0,
+                seed=1,
+            )
+
+    samples, elapsed = asyncio.run(drive())
+    assert samples
+    assert elapsed >= 0.2
+    assert {s.status for s in samples} == {200}
+
+
+def test_login_mix_reports_reads_separately(client, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_ENABLED", False)
+    create_user(db_session, username=username(0), password=PASSWORD)
+    token = login_and_get_token(client, username(0), PASSWORD)
+    create_post_api(client, token, "t1", "c", True)
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await run_scenario(
+                c,
+                LoginMix(),
+                Context(users=1),
+                concurrency=1,
+                duration=1.0,
+                warmup=0.0,
+                seed=1,
+            )
+
+    samples, elapsed = asyncio.run(drive())
+    kinds = summarize_kinds(samples, elapsed)
+    assert set(kinds) == {"login", "read"}
+    assert sum(k["requests"] for k in kinds.values()) == len(samples)
+    assert {s.status for s in samples} == {200}
+
+
+def test_login_mix_splits_workers_into_roles():
+    mix = LoginMix()
+    assert [mix.for_worker(i, 4).kind for i in range(4)] == [
+        "login",
+        "read",
+        "read",
+        "read",
+    ]
+    assert mix.for_worker(0, 1) is mix
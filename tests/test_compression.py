@@ -0,0 +1,80 @@
+import json
+
+from app.core.compression import negotiate_encoding, supported_encodings
+from app.crud.post import get_post_cache
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_negotiate_encoding():
+    preferred = supported_encodings()[0]
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") == preferred
+    assert negotiate_encoding("br;q=0.9, gzip;q=0.5") == preferred
+
+
+def test_list_compressed_only_when_large_and_accepted(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "t1", "lorem ipsum " * 500, True)
+
+    r = client.get("/api/posts", headers=GZIP)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.json()["items"][0]["title"] == "t1"
+
+    r = client.get("/api/posts", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+
+    r = client.get("/api/posts/health", headers=GZIP)
+    assert "content-encoding" not in r.headers
+
+
+def test_single_post_served_precompressed_from_cache(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    created = create_post_api(client, token, "t1", "lorem ipsum " * 500, True)
+
+    first = client.get(f"/api/posts/{created['id']}", headers=GZIP)
+    assert first.status_code == 200, first.text
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].startswith('W/"')
+    assert first.json()["id"] == created["id"]
+
+    entry = get_post_cache().get(created["id"])
+    assert set(entry.compressed) == {"gzip"}
+
+    second = client.get(f"/api/posts/{created['id']}", headers=GZIP)
+    assert second.content == first.content
+    assert get_post_cache().get(created["id"]) is entry
+
+    r = client.get(
+        f"/api/posts/{created['id']}",
+        headers={**GZIP, "If-None-Match": first.headers["etag"]},
+    )
+    assert r.status_code == 304
+
+    r = client.get(
+        f"/api/posts/{created['id']}", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in r.headers
+    assert r.json() == first.json()
+
+
+def test_streaming_export_compressed(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    for i in range(3):
+        create_post_api(client, token, f"t{i}", "c", True)
+
+    r = client.get("/api/posts/export", headers=GZIP)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [p["title"] for p in lines] == ["t2", "t1", "t0"]
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.config import get_settings
+from app.db.session import InstrumentedQueuePool, _pool_options, check_backend
+
+
+def test_pool_options_follow_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 300)
+
+    options = _pool_options("postgresql://u@h/db", InstrumentedQueuePool)
+    assert options["pool_size"] == 3
+    assert options["pool_pre_ping"] is False
+    assert options["pool_recycle"] == 300
+    assert options["poolclass"] is InstrumentedQueuePool
+
+    # in-memory SQLite can't use a QueuePool
+    assert "poolclass" not in _pool_options("sqlite://", InstrumentedQueuePool)
+
+
+def test_unsupported_backend_is_rejected_at_startup():
+    check_backend("postgresql+psycopg2://u@h/db")
+    check_backend("sqlite:///./app.db")
+    with pytest.raises(RuntimeError, match="mysql"):
+        check_backend("mysql+pymysql://u@h/db")
+
+
+def test_pool_stats_count_checkouts_and_timeouts(monkeypatch, tmp_path):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **_pool_options(url, InstrumentedQueuePool))
+    stats = InstrumentedQueuePool.stats
+    stats.reset()
+
+    try:
+        with engine.connect():
+            snapshot = stats.snapshot(engine.pool)
+            assert snapshot["checked_out"] == 1
+            assert snapshot["size"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        snapshot = stats.snapshot(engine.pool)
+    finally:
+        engine.dispose()
+
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["overflow_in_use"] == 0
+    assert snapshot["wait_ms_max"] >= 50
+
+
+def test_pool_stats_endpoint(client, monkeypatch):
+    # disabled by default: no auth in front of it
+    assert client.get("/api/ops/pool").status_code == 404
+    assert client.get("/api/ops/caches").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "OPS_ENDPOINTS_ENABLED", True)
+    r = client.get("/api/ops/pool")
+    assert r.status_code == 200, r.text
+    assert {"checkouts", "timeouts", "checked_out", "overflow_in_use"} <= set(
+        r.json()["sync"]
+    )
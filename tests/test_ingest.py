@@ -0,0 +1,124 @@
+import json
+from contextlib import contextmanager
+
+from sqlalchemy import select
+
+from app.ingest import Checkpoint, ingest, read_records
+from app.models.post import Post
+from app.models.user import User
+from tests.helpers import create_user
+
+
+def _begin(db_session):
+    @contextmanager
+    def begin():
+        conn = db_session.connection()
+        with conn.begin_nested():
+            yield conn
+
+    return begin
+
+
+def _write_jsonl(path, records, mode="w"):
+    with open(path, mode) as f:
+        for record in records:
+            f.write(record if isinstance(record, str) else json.dumps(record))
+            f.write("\n")
+
+
+def test_ingest_posts_rejects_invalid_records_and_resumes(db_session, tmp_path):
+    alice = create_user(db_session, username="alice", password="12345678")
+    path = tmp_path / "posts.jsonl"
+    checkpoint = tmp_path / "posts.checkpoint"
+    rejects = tmp_path / "rejects.jsonl"
+    _write_jsonl(
+        path,
+        [
+            {"title": "t1", "content": "<p>tab\there</p>", "author": "alice"},
+            {"title": "t2", "content": "back\\slash\nnew", "author_id": alice.id},
+            "not json",
+            {"title": "", "content": "c", "author": "alice"},
+            {"title": "t3", "content": "c", "author": "nobody"},
+            {"title": "t4", "content": "c", "is_public": False},
+        ],
+    )
+    options = dict(
+        kind="posts",
+        fmt="jsonl",
+        chunk_size=2,
+        checkpoint_path=checkpoint,
+        rejects_path=rejects,
+        default_author="alice",
+        report=lambda line: None,
+    )
+
+    done = ingest(_begin(db_session), path, **options)
+    assert (done.rows, done.rejected, done.line) == (3, 3, 6)
+    assert Checkpoint.load(checkpoint, "posts") == done
+    assert [r["line"] for r in map(json.loads, rejects.read_text().splitlines())] == [
+        3,
+        4,
+        5,
+    ]
+
+    posts = db_session.scalars(select(Post).order_by(Post.id)).all()
+    assert [(p.title, p.content, p.is_public) for p in posts] == [
+        ("t1", "<p>tab\there</p>", True),
+        ("t2", "back\\slash\nnew", True),
+        ("t4", "c", False),
+    ]
+    assert {p.author_id for p in posts} == {alice.id}
+    assert posts[0].summary == "tab here"
+
+    # a rerun starts after the last committed record
+    _write_jsonl(path, [{"title": "t5", "content": "c"}], mode="a")
+    done = ingest(_begin(db_session), path, **options)
+    assert (done.rows, done.line) == (4, 7)
+    titles = db_session.scalars(select(Post.title).order_by(Post.id)).all()
+    assert titles == ["t1", "t2", "t4", "t5"]
+
+
+def test_ingest_users_from_csv(db_session, tmp_path):
+    create_user(db_session, username="alice", password="12345678")
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,password,hashed_password\n"
+        "bob,12345678,\n"
+        "carol,,$2b$12$abcdefghijklmnopqrstuv\n"
+        "alice,12345678,\n"
+        "bob,12345678,\n"
+        "dave,short,\n"
+    )
+
+    done = ingest(
+        _begin(db_session),
+        path,
+        kind="users",
+        fmt="csv",
+        chunk_size=100,
+        checkpoint_path=None,
+        report=lambda line: None,
+    )
+    assert (done.rows, done.rejected) == (2, 3)
+    users = dict(db_session.execute(select(User.username, User.hashed_password)).all())
+    assert set(users) == {"alice", "bob", "carol"}
+    assert users["carol"] == "$2b$12$abcdefghijklmnopqrstuv"
+
+
+def test_read_csv_offsets_span_multiline_records(tmp_path):
+    path = tmp_path / "posts.csv"
+    path.write_bytes(b'title,content\nt1,"line one\nline two"\nt2,c\n')
+
+    with open(path, "rb") as f:
+        records = list(read_records(f, "csv"))
+    assert [(line, record) for line, _, record in records] == [
+        (3, {"title": "t1", "content": "line one\nline two"}),
+        (4, {"title": "t2", "content": "c"}),
+    ]
+
+    # resuming from the first record's end offset yields only the second
+    _, offset, _ = records[0]
+    with open(path, "rb") as f:
+        assert [r for _, _, r in read_records(f, "csv", offset, 3)] == [
+            {"title": "t2", "content": "c"}
+        ]
@@ -0,0 +1,52 @@
+import pytest
+
+from app.core import metrics
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(engine):
+    # the app's own engine isn't used under test; count the test engine's SQL
+    metrics.instrument_engine(engine)
+    for metric in metrics.REGISTRY:
+        metric.clear()
+    yield
+
+
+def test_request_metrics_per_route(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    post = create_post_api(client, token, "t1", "c", True)
+
+    client.get("/api/posts")
+    client.get(f"/api/posts/{post['id']}")
+    client.get("/api/posts/999999999")
+    client.get("/no/such/path")
+
+    latency = metrics.REQUEST_LATENCY
+    assert latency.count(("GET", "/api/posts", 200)) == 1
+    assert latency.count(("POST", "/api/posts", 201)) == 1
+    assert latency.count(("GET", "/api/posts/{post_id}", 200)) == 1
+    assert latency.count(("GET", "/api/posts/{post_id}", 404)) == 1
+    assert latency.count(("GET", "unmatched", 404)) == 1
+    assert metrics.IN_FLIGHT.value() == 0
+
+    # the list runs a count and a page query
+    assert metrics.REQUEST_QUERIES.count(("GET", "/api/posts")) == 1
+    assert metrics.REQUEST_QUERIES._values[("GET", "/api/posts")][-2] >= 2
+
+    assert metrics.PASSWORD_HASHING.count(("verify",)) == 1
+
+
+def test_metrics_endpoint_renders_prometheus_text(client):
+    client.get("/api/posts/health")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    labels = 'method="GET",route="/api/posts/health",status="200"'
+    assert f"http_request_duration_seconds_count{{{labels}}} 1" in body
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+    assert "http_requests_in_flight 1" in body  # the scrape itself
@@ -1,3 +1,18 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.crud import post as crud_post
+from app.crud.post import get_page_cached, get_visible_posts, search_posts
+from app.crud.user import UserSnapshot
+from app.db.base import Base
+from app.models.post import Post
+from app.models.user import User
+
 from tests.helpers import (
     create_user,
     login_and_get_token,
@@ -240,3 +255,492 @@ def test_posts_pagination_mine_includes_private(client, db_session):
     assert data["total"] == 2
     ids = {p["id"] for p in data["items"]}
     assert ids == {a_pub["id"], a_priv["id"]}
+
+
+def test_posts_cursor_pagination_walks_all_pages(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+
+    created = [create_post_api(client, token, f"t{i}", "c", True) for i in range(5)]
+
+    seen = []
+    r = client.get("/api/posts", params={"limit": 2})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    seen.extend(p["id"] for p in data["items"])
+    while data["next_cursor"]:
+        r = client.get("/api/posts", params={"limit": 2, "cursor": data["next_cursor"]})
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert data["total"] == 5
+        seen.extend(p["id"] for p in data["items"])
+
+    # newest first, no duplicates or gaps even with identical created_at
+    assert seen == sorted((p["id"] for p in created), reverse=True)
+
+
+def test_cursor_pages_reach_the_end_on_sqlite(tmp_path):
+    # SQLite stores CURRENT_TIMESTAMP without a fractional part, while cursors
+    # bind datetimes with microseconds; the keys must still compare correctly
+    engine = create_engine(f"sqlite:///{tmp_path / 'cursor.db'}")
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as db:
+            db.add(User(id=1, username="alice", hashed_password="x"))
+            db.add_all(
+                Post(title=f"t{i}", content="c", is_public=i % 2 == 0, author_id=1)
+                for i in range(5)
+            )
+            db.commit()
+
+            for viewer in (None, UserSnapshot(1, "alice", True)):
+                seen, cursor = [], None
+                for _ in range(10):
+                    items, _, _ = get_visible_posts(
+                        db, current_user=viewer, limit=2, cursor=cursor
+                    )
+                    seen.extend(post.id for post in items)
+                    if len(items) < 2:
+                        break
+                    cursor = (items[-1].created_at, items[-1].id)
+                expected = [5, 4, 3, 2, 1] if viewer else [5, 3, 1]
+                assert seen == expected
+    finally:
+        engine.dispose()
+
+
+def test_posts_invalid_cursor_400(client):
+    r = client.get("/api/posts", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400, r.text
+
+
+def test_posts_sparse_fields(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    pub = create_post_api(client, token, "pub", "x" * 20000, True)
+    priv = create_post_api(client, token, "priv", "y" * 20000, False)
+
+    # signed in: public and own private posts come from separate union branches
+    r = client.get(
+        "/api/posts",
+        params={"fields": "title,created_at", "limit": 1},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["items"] == [
+        {"id": priv["id"], "title": "priv", "created_at": priv["created_at"]}
+    ]
+
+    r = client.get(
+        "/api/posts",
+        params={"fields": "title", "limit": 1, "cursor": data["next_cursor"]},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["items"] == [{"id": pub["id"], "title": "pub"}]
+
+    r = client.get("/api/posts", params={"fields": "id,content"})
+    assert r.status_code == 200, r.text
+    assert r.json()["items"] == [{"id": pub["id"], "content": "x" * 20000}]
+
+    # without fields the full representation is unchanged
+    r = client.get("/api/posts")
+    assert set(r.json()["items"][0]) == set(pub)
+
+    r = client.get("/api/posts", params={"fields": "title,password"})
+    assert r.status_code == 400, r.text
+
+
+def test_posts_expand_author(client, db_session):
+    alice = create_user(db_session, username="alice", password="12345678")
+    bob = create_user(db_session, username="bob", password="12345678")
+    alice_token = login_and_get_token(client, "alice", "12345678")
+    bob_token = login_and_get_token(client, "bob", "12345678")
+    first = create_post_api(client, alice_token, "t1", "c", True)
+    second = create_post_api(client, bob_token, "t2", "c", True)
+
+    r = client.get("/api/posts", params={"expand": "author"})
+    assert r.status_code == 200, r.text
+    assert r.json()["items"] == [
+        {**second, "author": {"id": bob.id, "username": "bob"}},
+        {**first, "author": {"id": alice.id, "username": "alice"}},
+    ]
+
+    r = client.get("/api/posts", params={"fields": "title", "expand": "author"})
+    assert r.json()["items"][1] == {
+        "id": first["id"],
+        "title": "t1",
+        "author": {"id": alice.id, "username": "alice"},
+    }
+
+    # the plain and expanded detail bodies are cached and validated separately
+    plain = client.get(f"/api/posts/{first['id']}")
+    expanded = client.get(f"/api/posts/{first['id']}", params={"expand": "author"})
+    assert expanded.status_code == 200, expanded.text
+    assert expanded.json() == {
+        **plain.json(),
+        "author": {"id": alice.id, "username": "alice"},
+    }
+    assert expanded.headers["ETag"] != plain.headers["ETag"]
+    r = client.get(
+        f"/api/posts/{first['id']}",
+        params={"expand": "author"},
+        headers={"If-None-Match": expanded.headers["ETag"]},
+    )
+    assert r.status_code == 304
+
+    r = client.patch(
+        f"/api/posts/{first['id']}",
+        json={"title": "t3"},
+        headers=auth_headers(alice_token),
+    )
+    r = client.get(f"/api/posts/{first['id']}", params={"expand": "author"})
+    assert r.json()["title"] == "t3"
+
+    assert client.get("/api/posts", params={"expand": "comments"}).status_code == 400
+    r = client.get(f"/api/posts/{first['id']}", params={"expand": "comments"})
+    assert r.status_code == 400
+
+
+def test_posts_fast_json_matches_model_output(client, db_session, monkeypatch):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "pub", "ünïcode", True)
+    create_post_api(client, token, "priv", "c", False)
+
+    requests = [
+        ({}, {}),
+        ({"limit": 1}, auth_headers(token)),
+        ({"fields": "summary,title"}, auth_headers(token)),
+        ({"mine": True, "is_public": False}, auth_headers(token)),
+        ({"expand": "author"}, auth_headers(token)),
+        ({"fields": "title", "expand": "author"}, {}),
+    ]
+    settings = get_settings()
+    for params, headers in requests:
+        monkeypatch.setattr(settings, "POST_LIST_FAST_JSON", False)
+        slow = client.get("/api/posts", params=params, headers=headers)
+        monkeypatch.setattr(settings, "POST_LIST_FAST_JSON", True)
+        fast = client.get("/api/posts", params=params, headers=headers)
+        assert fast.status_code == slow.status_code == 200, fast.text
+        assert fast.content == slow.content
+
+
+def test_posts_total_modes(client, db_session, monkeypatch):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "t1", "c", True)
+
+    r = client.get("/api/posts", params={"total_mode": "none"})
+    assert r.status_code == 200, r.text
+    assert r.json()["total"] is None
+    assert r.json()["total_mode"] == "none"
+
+    r = client.get("/api/posts", params={"total_mode": "estimated"})
+    assert r.status_code == 200, r.text
+    # a small or never-analyzed table is counted exactly
+    assert r.json()["total_mode"] == "exact"
+    assert r.json()["total"] == 1
+
+    db_session.execute(text("ANALYZE posts"))
+    monkeypatch.setattr(crud_post, "_ESTIMATE_MIN_ROWS", 0)
+    # another limit, so the page rendered above is not served from the cache
+    r = client.get("/api/posts", params={"total_mode": "estimated", "limit": 5})
+    assert r.json()["total_mode"] == "estimated"
+    assert isinstance(r.json()["total"], int)
+
+    r = client.get("/api/posts", params={"total_mode": "bogus"})
+    assert r.status_code == 422
+
+
+def test_posts_cached_total_invalidated_by_writes(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "t1", "c", True)
+
+    r = client.get("/api/posts", params={"total_mode": "cached"})
+    assert r.json()["total"] == 1
+    assert r.json()["total_mode"] == "cached"
+
+    post = create_post_api(client, token, "t2", "c", True)
+    r = client.get("/api/posts", params={"total_mode": "cached"})
+    assert r.json()["total"] == 2
+
+    # a private post leaves the anonymous scope alone but not the author's
+    r = client.get(
+        "/api/posts",
+        params={"total_mode": "cached", "mine": "true"},
+        headers=auth_headers(token),
+    )
+    assert r.json()["total"] == 2
+    create_post_api(client, token, "t3", "c", False)
+    r = client.get(
+        "/api/posts",
+        params={"total_mode": "cached", "mine": "true"},
+        headers=auth_headers(token),
+    )
+    assert r.json()["total"] == 3
+
+    r = client.delete(f"/api/posts/{post['id']}", headers=auth_headers(token))
+    assert r.status_code == 204
+    r = client.get("/api/posts", params={"total_mode": "cached"})
+    assert r.json()["total"] == 1
+
+
+def test_anonymous_pages_cached_until_public_write(
+    client, db_session, assert_queries, monkeypatch
+):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "t1", "c", True)
+
+    with assert_queries(2):
+        first = client.get("/api/posts", params={"fields": "title,id"})
+    # equivalent parameters share the entry, and only the bytes are served
+    with assert_queries(0):
+        r = client.get("/api/posts", params={"fields": "id,title", "is_public": True})
+        assert r.content == first.content
+        r = client.get(
+            "/api/posts",
+            params={"fields": "title"},
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        assert r.status_code == 304
+    monkeypatch.setattr(get_settings(), "POST_PAGE_CACHE_PAGES", 0)
+    uncached = client.get("/api/posts", params={"fields": "title,id"})
+    assert uncached.json() == first.json()
+    monkeypatch.setattr(get_settings(), "POST_PAGE_CACHE_PAGES", 3)
+
+    # private writes leave anonymous pages alone; public ones replace them
+    create_post_api(client, token, "t2", "c", False)
+    with assert_queries(0):
+        client.get("/api/posts", params={"fields": "title"})
+    create_post_api(client, token, "t3", "c", True)
+    r = client.get("/api/posts", params={"fields": "title"})
+    assert [item["title"] for item in r.json()["items"]] == ["t3", "t1"]
+
+    # only the first pages, and never cursor pages or signed-in viewers
+    cursor = client.get("/api/posts", params={"limit": 1}).json()["next_cursor"]
+    for params, headers in [
+        ({"skip": 60}, {}),
+        ({"limit": 1, "cursor": cursor}, {}),
+        ({}, auth_headers(token)),
+    ]:
+        client.get("/api/posts", params=params, headers=headers)
+        with assert_queries(2):
+            client.get("/api/posts", params=params, headers=headers)
+
+
+def test_page_cache_renders_once_for_concurrent_misses():
+    started, release = threading.Event(), threading.Event()
+    renders = []
+
+    def render():
+        renders.append(1)
+        started.set()
+        release.wait(5)
+        return b'{"items":[]}'
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(get_page_cached, ("key",), render) for _ in range(8)]
+        assert started.wait(5)
+        release.set()
+        pages = {id(future.result()) for future in futures}
+    assert len(renders) == 1
+    assert len(pages) == 1
+
+
+def test_get_post_etag_and_not_modified(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    post = create_post_api(client, token, "t1", "c1", True)
+
+    r = client.get(f"/api/posts/{post['id']}")
+    assert r.status_code == 200, r.text
+    etag = r.headers["ETag"]
+    assert r.json()["title"] == "t1"
+
+    r = client.get(f"/api/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+
+    # an update invalidates the cached copy and yields a new validator
+    r = client.patch(
+        f"/api/posts/{post['id']}",
+        json={"title": "t2"},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    r = client.get(f"/api/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["title"] == "t2"
+    assert r.headers["ETag"] != etag
+
+
+def test_get_post_cached_private_still_checks_permissions(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    alice_token = login_and_get_token(client, "alice", "12345678")
+    post = create_post_api(client, alice_token, "secret", "c", False)
+
+    r = client.get(f"/api/posts/{post['id']}", headers=auth_headers(alice_token))
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+
+    r = client.get(f"/api/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert r.status_code == 401
+
+    create_user(db_session, username="bob", password="12345678")
+    bob_token = login_and_get_token(client, "bob", "12345678")
+    r = client.get(
+        f"/api/posts/{post['id']}",
+        headers={"If-None-Match": etag, **auth_headers(bob_token)},
+    )
+    assert r.status_code == 403
+
+    # deleting drops the cached copy
+    client.delete(f"/api/posts/{post['id']}", headers=auth_headers(alice_token))
+    r = client.get(f"/api/posts/{post['id']}", headers=auth_headers(alice_token))
+    assert r.status_code == 404
+
+
+def test_search_posts_ranked_and_visibility(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+
+    in_title = create_post_api(client, token, "Kafka tuning", "notes", True)
+    in_body = create_post_api(client, token, "misc", "we moved off kafka", True)
+    private = create_post_api(client, token, "kafka secrets", "hidden", False)
+    create_post_api(client, token, "unrelated", "nothing here", True)
+
+    r = client.get("/api/posts/search", params={"q": "kafka"})
+    assert r.status_code == 200, r.text
+    ids = [p["id"] for p in r.json()["items"]]
+    # title matches outrank body matches; private posts stay hidden
+    assert ids == [in_title["id"], in_body["id"]]
+
+    r = client.get(
+        "/api/posts/search", params={"q": "kafka"}, headers=auth_headers(token)
+    )
+    assert private["id"] in {p["id"] for p in r.json()["items"]}
+
+    # blank queries are rejected before they reach the database
+    assert client.get("/api/posts/search", params={"q": "  "}).status_code == 422
+
+
+def test_search_posts_blank_fts5_query_matches_nothing():
+    # on SQLite an empty MATCH would be a syntax error; no table is needed
+    with Session(create_engine("sqlite://")) as db:
+        assert search_posts(db, q=" \t", current_user=None) == []
+
+
+def test_search_posts_cursor_pagination(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    created = [create_post_api(client, token, "raft", "c", True) for _ in range(3)]
+
+    seen = []
+    params = {"q": "raft", "limit": 2}
+    while True:
+        r = client.get("/api/posts/search", params=params)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        seen.extend(p["id"] for p in data["items"])
+        if not data["next_cursor"]:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    assert sorted(seen) == sorted(p["id"] for p in created)
+    assert len(seen) == len(set(seen))
+
+
+def test_batch_create_reports_per_item_errors(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+
+    r = client.post(
+        "/api/posts:batch",
+        json={
+            "items": [
+                {"title": "b1", "content": "c"},
+                {"title": "", "content": "c"},
+                {"title": "b3", "content": "c", "is_public": False},
+            ]
+        },
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert (data["succeeded"], data["failed"]) == (2, 1)
+    assert [item["status"] for item in data["items"]] == [201, 422, 201]
+    assert data["items"][0]["item"]["title"] == "b1"
+    assert data["items"][2]["item"]["is_public"] is False
+
+    r = client.get("/api/posts", params={"mine": "true"}, headers=auth_headers(token))
+    assert r.json()["total"] == 2
+
+
+def test_batch_update_and_delete_check_ownership(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    alice_token = login_and_get_token(client, "alice", "12345678")
+    a1 = create_post_api(client, alice_token, "a1", "c", True)
+    a2 = create_post_api(client, alice_token, "a2", "c", True)
+
+    create_user(db_session, username="bob", password="12345678")
+    bob_token = login_and_get_token(client, "bob", "12345678")
+    b1 = create_post_api(client, bob_token, "b1", "c", True)
+
+    r = client.patch(
+        "/api/posts:batch",
+        json={
+            "items": [
+                {"id": a1["id"], "title": "a1-new"},
+                {"id": a2["id"], "is_public": False},
+                {"id": b1["id"], "title": "hacked"},
+                {"id": 10**9, "title": "ghost"},
+            ]
+        },
+        headers=auth_headers(alice_token),
+    )
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert [item["status"] for item in items] == [200, 200, 403, 404]
+    assert items[0]["item"]["title"] == "a1-new"
+    assert items[1]["item"]["is_public"] is False
+    assert client.get(f"/api/posts/{b1['id']}").json()["title"] == "b1"
+
+    r = client.request(
+        "DELETE",
+        "/api/posts:batch",
+        json={"ids": [a1["id"], b1["id"], a1["id"]]},
+        headers=auth_headers(alice_token),
+    )
+    assert r.status_code == 200, r.text
+    assert [item["status"] for item in r.json()["items"]] == [204, 403, 409]
+    assert client.get(f"/api/posts/{a1['id']}").status_code == 404
+    assert client.get(f"/api/posts/{b1['id']}").status_code == 200
+
+
+def test_export_streams_visible_posts_as_ndjson(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    pub = create_post_api(client, token, "pub", "c", True)
+    priv = create_post_api(client, token, "priv", "c", False)
+
+    r = client.get("/api/posts/export")
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert pub["id"] in {row["id"] for row in rows}
+    assert all(row["is_public"] for row in rows)
+
+    # httpx transparently decodes the gzip body
+    r = client.get(
+        "/api/posts/export",
+        params={"mine": "true", "gzip": "true"},
+        headers=auth_headers(token),
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == [priv["id"], pub["id"]]
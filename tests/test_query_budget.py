@@ -0,0 +1,194 @@
+import logging
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+
+from app.core import metrics, querydebug
+from app.core.config import get_settings
+from app.core.metrics import QueryStats, current_query_stats
+from app.models.post import Post
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+
+@pytest.fixture(autouse=True)
+def instrumented(engine):
+    # the app's own engine isn't used under test; watch the test engine
+    metrics.instrument_engine(engine)
+    querydebug.instrument_engine(engine)
+    querydebug.instrument_sessions()
+
+
+@pytest.fixture()
+def raiseload(monkeypatch):
+    """Lazy relationship loads raise instead of running a query."""
+    monkeypatch.setattr(get_settings(), "QUERY_DEBUG_RAISELOAD", True)
+
+
+def test_query_counts_per_endpoint(
+    client, db_session, assert_queries, raiseload, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "OPS_ENDPOINTS_ENABLED", True)
+    # SQLite can't return the ids of a multi-row INSERT in parameter order, so
+    # create_posts falls back to one INSERT per row there
+    batch_inserts = 1 if db_session.get_bind().dialect.name == "postgresql" else 2
+    create_user(db_session, username="alice", password="12345678")
+
+    with assert_queries(1):
+        token = login_and_get_token(client, "alice", "12345678")
+    auth = {"Authorization": f"Bearer {token}"}
+
+    with assert_queries(3):
+        r = client.post("/api/users", json={"username": "bob", "password": "12345678"})
+        assert r.status_code == 201, r.text
+    with assert_queries(1):
+        assert client.get("/api/users/me", headers=auth).status_code == 200
+    with assert_queries(2):
+        post = create_post_api(client, token, "t1", "hello world", True)
+    with assert_queries(2):
+        assert client.get("/api/posts").status_code == 200
+    with assert_queries(2):
+        assert client.get("/api/posts", headers=auth).status_code == 200
+    with assert_queries(1):
+        assert client.get(f"/api/posts/{post['id']}").status_code == 200
+    with assert_queries(3):
+        r = client.patch(f"/api/posts/{post['id']}", json={"title": "t2"}, headers=auth)
+        assert r.status_code == 200, r.text
+    with assert_queries(1):
+        assert client.get("/api/posts/export", headers=auth).status_code == 200
+    with assert_queries(1):
+        assert client.get("/api/feed", headers=auth).status_code == 200
+    with assert_queries(1):
+        r = client.get("/api/posts/search", params={"q": "hello"})
+        assert r.status_code == 200, r.text
+    with assert_queries(1 + batch_inserts):
+        r = client.post(
+            "/api/posts:batch",
+            json={
+                "items": [
+                    {"title": "a", "content": "c"},
+                    {"title": "b", "content": "c"},
+                ]
+            },
+            headers=auth,
+        )
+        assert r.status_code == 200, r.text
+    ids = [item["id"] for item in r.json()["items"]]
+    with assert_queries(3):
+        r = client.patch(
+            "/api/posts:batch",
+            json={"items": [{"id": i, "is_public": False} for i in ids]},
+            headers=auth,
+        )
+        assert r.status_code == 200, r.text
+    with assert_queries(2):
+        r = client.request(
+            "DELETE", "/api/posts:batch", json={"ids": ids}, headers=auth
+        )
+        assert r.status_code == 200, r.text
+    with assert_queries(2):
+        r = client.delete(f"/api/posts/{post['id']}", headers=auth)
+        assert r.status_code == 204
+    with assert_queries(0):
+        for path in ("/", "/api/posts/health", "/api/ops/caches", "/api/ops/pool"):
+            assert client.get(path, headers=auth).status_code == 200
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_expand_author_query_count_independent_of_authors(
+    client, db_session, assert_queries, raiseload, monkeypatch, fast_json
+):
+    monkeypatch.setattr(get_settings(), "POST_LIST_FAST_JSON", fast_json)
+    for n in range(5):
+        author = create_user(db_session, username=f"user{n}", password="12345678")
+        db_session.add_all(
+            Post(title=f"t{n}.{i}", content="c", author_id=author.id) for i in range(3)
+        )
+    db_session.commit()
+    db_session.expunge_all()
+    params = {"expand": "author", "total_mode": "none"}
+
+    # the ORM path adds one selectinload query; rows join the authors in
+    expected = 1 if fast_json else 2
+    for limit in (1, 15):
+        with assert_queries(expected):
+            r = client.get("/api/posts", params={**params, "limit": limit})
+            assert r.status_code == 200, r.text
+        assert len({item["author"]["username"] for item in r.json()["items"]}) == (
+            1 if limit == 1 else 5
+        )
+
+    post_id = r.json()["items"][0]["id"]
+    with assert_queries(1):
+        client.get(f"/api/posts/{post_id}", params={"expand": "author"})
+    with assert_queries(0):
+        client.get(f"/api/posts/{post_id}", params={"expand": "author"})
+        client.get(f"/api/posts/{post_id}")
+
+
+def test_list_does_not_load_authors(client, db_session, assert_queries):
+    alice = create_user(db_session, username="alice", password="12345678")
+    db_session.add(Post(title="t1", content="c", author_id=alice.id))
+    db_session.commit()
+    # nothing left in the identity map to satisfy post.author without SQL
+    db_session.expunge_all()
+
+    with assert_queries(2):
+        r = client.get("/api/posts")
+        assert r.status_code == 200, r.text
+
+
+def _load_posts_and_authors(db_session) -> list[str]:
+    # fresh instances, so the authors aren't already in the identity map
+    db_session.expunge_all()
+    posts = db_session.scalars(select(Post).order_by(Post.id)).all()
+    return [post.author.username for post in posts]
+
+
+def test_lazy_loads_are_counted_and_reported(db_session, caplog):
+    alice = create_user(db_session, username="alice", password="12345678")
+    db_session.add(Post(title="t1", content="c", author_id=alice.id))
+    db_session.commit()
+
+    stats = QueryStats({"method": "GET"})
+    stats.lazy_loads = Counter()
+    token = current_query_stats.set(stats)
+    try:
+        assert _load_posts_and_authors(db_session) == ["alice"]
+    finally:
+        current_query_stats.reset(token)
+    assert stats.lazy_loads == {"Post.author": 1}
+
+    with caplog.at_level(logging.WARNING, logger="app.core.querydebug"):
+        querydebug.QueryDebugMiddleware.report(stats)
+    assert "GET unmatched lazy-loaded Post.author x1" in caplog.text
+
+
+def test_raiseload_turns_lazy_loads_into_errors(db_session, raiseload):
+    alice = create_user(db_session, username="alice", password="12345678")
+    db_session.add(Post(title="t1", content="c", author_id=alice.id))
+    db_session.commit()
+
+    with pytest.raises(InvalidRequestError, match="Post.author"):
+        _load_posts_and_authors(db_session)
+
+
+def test_budget_raise_mode_fails_the_request(client, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "QUERY_DEBUG", True)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "raise")
+    monkeypatch.setattr(settings, "QUERY_BUDGETS", "GET /api/posts=1")
+
+    # the list runs a count and a page query
+    with pytest.raises(querydebug.QueryBudgetExceeded, match="GET /api/posts"):
+        client.get("/api/posts")
+    assert client.get("/api/posts", params={"total_mode": "none"}).status_code == 200
+
+
+def test_slow_statements_logged_with_route(client, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "SLOW_QUERY_MS", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.querydebug"):
+        client.get("/api/posts/999999999")
+    assert "in GET /api/posts/{post_id}: SELECT posts.id" in caplog.text
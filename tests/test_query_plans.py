@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.crud.feed import feed_statement
+from app.crud.post import visible_posts_statement
+from app.crud.user import UserSnapshot
+from tests.helpers import create_user
+
+CURSOR = (datetime(2030, 1, 1, tzinfo=timezone.utc), 10**9)
+
+# (signed in, mine, is_public) as the routes pass them to the crud layer
+VISIBILITY_CASES = [
+    (False, False, None),
+    (True, False, None),
+    (True, False, True),
+    (True, False, False),
+    (True, True, None),
+    (True, True, True),
+    (True, True, False),
+]
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture()
+def explain(db_session):
+    if db_session.get_bind().dialect.name != "postgresql":
+        pytest.skip("plan checks target PostgreSQL")
+
+    # make scans and sorts prohibitively expensive: if the planner still picks
+    # one, no index can serve the query
+    for setting in ("enable_seqscan", "enable_sort", "enable_bitmapscan"):
+        db_session.connection().exec_driver_sql(f"SET LOCAL {setting} = off")
+
+    def run(stmt) -> list[str]:
+        compiled = stmt.compile(
+            dialect=db_session.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        plan = (
+            db_session.connection()
+            .exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params
+            )
+            .scalar()
+        )
+        return [node["Node Type"] for node in _plan_nodes(plan[0]["Plan"])]
+
+    return run
+
+
+@pytest.mark.parametrize("signed_in,mine,is_public", VISIBILITY_CASES)
+@pytest.mark.parametrize("cursor", [None, CURSOR], ids=["offset", "keyset"])
+def test_feed_query_uses_indexes(
+    explain, db_session, signed_in, mine, is_public, cursor
+):
+    viewer = None
+    if signed_in:
+        user = create_user(db_session, username="planner", password="12345678")
+        viewer = UserSnapshot(user.id, user.username, user.is_active)
+
+    stmt = visible_posts_statement(
+        viewer, skip=40, limit=20, mine=mine, is_public=is_public, cursor=cursor
+    )
+    nodes = explain(stmt)
+
+    assert "Seq Scan" not in nodes, nodes
+    assert not any("Sort" in node for node in nodes), nodes
+
+
+@pytest.mark.parametrize("cursor", [None, CURSOR], ids=["first", "keyset"])
+def test_home_feed_query_uses_indexes(explain, db_session, cursor):
+    user = create_user(db_session, username="planner", password="12345678")
+
+    stmt = feed_statement(
+        db_session, user_id=user.id, limit=20, cursor=cursor, max_followers=10
+    )
+    nodes = explain(stmt)
+
+    # only the merged page of at most 2 x limit rows is sorted
+    assert "Seq Scan" not in nodes, nodes
@@ -0,0 +1,109 @@
+import pytest
+
+from app.api.routes import auth
+from app.core import ratelimit
+from app.core.ratelimit import (
+    MemoryBackend,
+    RateLimit,
+    RateLimited,
+    RateLimiter,
+    get_rate_limiter,
+    parse_limit,
+)
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+
+def _login(client, username, password="12345678"):
+    return client.post(
+        "/api/auth/token",
+        data={"username": username, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+
+def test_parse_limit():
+    assert parse_limit("10/minute") == RateLimit(rate=10 / 60, burst=10)
+    assert parse_limit(" 2/seconds ") == RateLimit(rate=2, burst=2)
+    assert parse_limit("") is None
+    with pytest.raises(ValueError):
+        parse_limit("10/fortnight")
+
+
+def test_memory_backend_refills_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend(maxsize=2)
+    limit = RateLimit(rate=0.5, burst=2)
+
+    assert backend.hit("a", limit) == 0
+    assert backend.hit("a", limit) == 0
+    assert backend.hit("a", limit) == pytest.approx(2.0)
+    now[0] += 1
+    assert backend.hit("a", limit) == pytest.approx(1.0)
+    now[0] += 1
+    assert backend.hit("a", limit) == 0
+
+    # least recently used keys are dropped beyond maxsize
+    backend.hit("b", limit)
+    backend.hit("c", limit)
+    assert len(backend) == 2
+
+
+def test_rejected_request_is_not_counted_against_other_limits():
+    limiter = RateLimiter(
+        MemoryBackend(maxsize=10),
+        {"ip": RateLimit(rate=0.01, burst=2), "user": RateLimit(rate=0.01, burst=1)},
+    )
+    limiter.check(("ip", "1.2.3.4"), ("user", "alice"))
+    for _ in range(3):
+        with pytest.raises(RateLimited):
+            limiter.check(("ip", "1.2.3.4"), ("user", "alice"))
+    # the rejected checks refunded their ip tokens: one is still left
+    limiter.check(("ip", "1.2.3.4"), ("user", "bob"))
+    with pytest.raises(RateLimited):
+        limiter.check(("ip", "1.2.3.4"), ("user", "carol"))
+
+
+def test_login_limited_per_username_before_password_check(
+    client, db_session, monkeypatch
+):
+    create_user(db_session, username="alice", password="12345678")
+    monkeypatch.setitem(
+        get_rate_limiter().limits, "login_username", RateLimit(rate=0.01, burst=2)
+    )
+
+    assert _login(client, "alice", "wrongpass").status_code == 401
+    assert _login(client, "alice").status_code == 200
+
+    def fail(*args):
+        raise AssertionError("password checked for a rate-limited login")
+
+    monkeypatch.setattr(auth, "verify_password", fail)
+    r = _login(client, "alice")
+    assert r.status_code == 429, r.text
+    assert r.headers["Retry-After"] == "100"
+    # another username from the same client still gets through
+    assert _login(client, "bob").status_code == 401
+
+
+def test_writes_limited_per_user(client, db_session, monkeypatch):
+    create_user(db_session, username="alice", password="12345678")
+    create_user(db_session, username="bob", password="12345678")
+    alice = login_and_get_token(client, "alice", "12345678")
+    bob = login_and_get_token(client, "bob", "12345678")
+    monkeypatch.setitem(
+        get_rate_limiter().limits, "write_user", RateLimit(rate=1, burst=1)
+    )
+
+    create_post_api(client, alice, "t1", "c", True)
+    r = client.post(
+        "/api/posts",
+        json={"title": "t2", "content": "c"},
+        headers={"Authorization": f"Bearer {alice}"},
+    )
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"
+
+    create_post_api(client, bob, "t3", "c", True)
+    # reads are not limited
+    assert client.get("/api/posts").status_code == 200
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_recent_writers
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.db.base import Base
+from app.models.post import Post
+from app.models.user import User
+from tests.helpers import (
+    auth_headers,
+    create_post_api,
+    create_user,
+    login_and_get_token,
+)
+
+
+@pytest.fixture()
+def replicas(tmp_path):
+    """Two SQLite files standing in for replicas, each holding one marker post."""
+    urls = []
+    for name in ("replica-a", "replica-b"):
+        url = f"sqlite:///{tmp_path / name}.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(User(id=1, username=name, hashed_password="x"))
+            db.add(Post(title=name, content="c", is_public=True, author_id=1))
+            db.commit()
+        engine.dispose()
+        urls.append(url)
+    db_session.init_read_engines(urls)
+    try:
+        yield urls
+    finally:
+        db_session.init_read_engines([])
+
+
+def _titles(client, **kwargs):
+    r = client.get("/api/posts", **kwargs)
+    assert r.status_code == 200, r.text
+    return [p["title"] for p in r.json()["items"]]
+
+
+def test_reads_round_robin_across_replicas(client, replicas, monkeypatch):
+    # anonymous first pages would otherwise come from the page cache
+    monkeypatch.setattr(get_settings(), "POST_PAGE_CACHE_PAGES", 0)
+    monkeypatch.setattr(get_settings(), "OPS_ENDPOINTS_ENABLED", True)
+    seen = {tuple(_titles(client)) for _ in range(4)}
+    assert seen == {("replica-a",), ("replica-b",)}
+
+    stats = client.get("/api/ops/pool").json()["read"]
+    assert [s["checkouts"] for s in stats] == [2, 2]
+
+
+def test_recent_writer_reads_from_primary(client, db_session, replicas):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    create_post_api(client, token, "fresh", "c", True)
+
+    # the writer sees their own post straight away
+    assert _titles(client, headers=auth_headers(token)) == ["fresh"]
+    # everyone else is still served by the replicas
+    assert _titles(client) in (["replica-a"], ["replica-b"])
+
+    get_recent_writers().clear()  # window elapsed
+    assert _titles(client, headers=auth_headers(token)) in (
+        ["replica-a"],
+        ["replica-b"],
+    )
+
+
+def test_recent_writer_reads_past_caches_refilled_from_replicas(
+    client, db_session, replicas
+):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    post = create_post_api(client, token, "v1", "c", True)
+    r = client.patch(
+        f"/api/posts/{post['id']}", json={"title": "v2"}, headers=auth_headers(token)
+    )
+    assert r.status_code == 200
+
+    # the replicas have not seen the edit yet
+    for url in replicas:
+        engine = create_engine(url)
+        with Session(engine) as db:
+            db.add(Post(id=post["id"], title="v1", content="c", author_id=1))
+            db.commit()
+        engine.dispose()
+
+    # anonymous reads refill the post and count caches from a replica ...
+    assert client.get(f"/api/posts/{post['id']}").json()["title"] == "v1"
+    params = {"total_mode": "cached", "is_public": True}
+    assert client.get("/api/posts", params=params).json()["total"] == 2
+
+    # ... which the writer reads past until the window has elapsed
+    r = client.get(f"/api/posts/{post['id']}", headers=auth_headers(token))
+    assert r.json()["title"] == "v2"
+    r = client.get("/api/posts", params=params, headers=auth_headers(token))
+    assert r.json()["total"] == 1
@@ -0,0 +1,92 @@
+from sqlalchemy.orm import Session
+
+from app.crud.post import get_post, get_public_generation, summary_backfill_ids
+from app.workers.summary import SummaryWorker, make_excerpt, summarize_posts
+from tests.helpers import create_user, login_and_get_token, create_post_api
+
+
+def test_make_excerpt_strips_markup_and_truncates():
+    content = "<p>Hello <b>world</b> &amp; **friends**, see [docs](http://x.y)</p>"
+    assert make_excerpt(content, 200) == "Hello world & friends, see docs"
+
+    excerpt = make_excerpt("lorem ipsum dolor " * 50, 40)
+    assert len(excerpt) <= 40
+    assert excerpt.endswith("…")
+    assert not excerpt[:-1].endswith(" ")
+
+
+def test_make_excerpt_keeps_symbols_that_are_not_markdown():
+    text = "call snake_case_name from C# when a > b or x | y, 2 * 3 * 4"
+    assert make_excerpt(text, 200) == text
+    assert make_excerpt("#hashtag", 200) == "#hashtag"
+
+
+def test_make_excerpt_strips_block_markdown():
+    content = "## Notes\n> quoted __bold__ _it_ ~~old~~ `a_b`\n\n```py\nx = 1\n```"
+    assert make_excerpt(content, 200) == "Notes quoted bold it old a_b x = 1"
+    table = "| name | value |\n|------|:-----:|\n| a | 1 |"
+    assert make_excerpt(table, 200) == "name value a 1"
+
+
+def test_summarize_posts_keeps_updated_at_and_refreshes_cache(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    created = create_post_api(client, token, "t1", "# Title\n\nSome *body* text", True)
+    assert created["summary"] is None
+
+    # warm the single-post cache with the summary-less body
+    assert client.get(f"/api/posts/{created['id']}").json()["summary"] is None
+
+    assert summary_backfill_ids(db_session, after_id=0, limit=10) == [created["id"]]
+    assert summarize_posts(db_session, [created["id"]], 200) == 1
+    assert summary_backfill_ids(db_session, after_id=0, limit=10) == []
+
+    data = client.get(f"/api/posts/{created['id']}").json()
+    assert data["summary"] == "Title Some body text"
+    assert data["updated_at"] == created["updated_at"]
+
+    r = client.get("/api/posts", params={"fields": "title,summary"})
+    assert r.json()["items"] == [
+        {"id": created["id"], "title": "t1", "summary": "Title Some body text"}
+    ]
+
+
+def test_summaries_retire_cached_pages_only_for_public_posts(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    private = create_post_api(client, token, "p", "hidden", False)
+    public = create_post_api(client, token, "t", "shown", True)
+    generation = get_public_generation()
+
+    before = generation.value
+    summarize_posts(db_session, [private["id"]], 200)
+    assert generation.value == before
+    summarize_posts(db_session, [private["id"], public["id"]], 200)
+    assert generation.value == before + 1
+
+
+def test_summary_worker_batches_queued_posts(client, db_session):
+    create_user(db_session, username="alice", password="12345678")
+    token = login_and_get_token(client, "alice", "12345678")
+    ids = [
+        create_post_api(client, token, f"t{i}", f"body {i}", True)["id"]
+        for i in range(3)
+    ]
+
+    worker = SummaryWorker(
+        lambda: Session(bind=db_session.connection()),
+        length=50,
+        batch_size=2,
+        queue_size=10,
+    )
+    worker.enqueue(ids)  # not running yet: ignored
+    worker.start()
+    worker.enqueue(ids)
+    worker.stop()
+
+    db_session.expire_all()
+    assert [get_post(db_session, post_id).summary for post_id in ids] == [
+        "body 0",
+        "body 1",
+        "body 2",
+    ]